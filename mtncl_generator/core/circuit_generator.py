@@ -1,27 +1,43 @@
-from typing import Dict, List, Set, Optional, Tuple
-from dataclasses import dataclass
-import networkx as nx
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+import sys
 from ..parsers.boolean_parser import ASTNode, TokenType
 from ..parsers.vhdl_parser import GateInfo, Port
 
-@dataclass
+# Circuit elements are allocated per generation attempt; use slots where supported
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@lru_cache(maxsize=None)
+def _wire_name(index: int) -> str:
+    """Return the interned name of the wire with the given counter value."""
+    return sys.intern(f"w{index}")
+
+@lru_cache(maxsize=None)
+def _gate_name(gate_type: str, index: int) -> str:
+    """Return the interned instance name for a gate type and counter value."""
+    return sys.intern(f"{gate_type.lower()}{index}")
+
+@dataclass(**_DATACLASS_SLOTS)
 class Wire:
     name: str
     source: Optional[str] = None  # Gate that drives this wire
-    destinations: Set[str] = None  # Gates that read from this wire
+    destinations: List[str] = None  # Gates that read from this wire
     
     def __post_init__(self):
         if self.destinations is None:
-            self.destinations = set()
+            self.destinations = []
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GateInstance:
     gate_type: str
     instance_name: str
     inputs: Dict[str, str]  # Port name -> Wire name
     outputs: Dict[str, str]  # Port name -> Wire name
+    # Gates driving each input, None for primary inputs; filled in by the generator
+    input_drivers: Optional[Tuple[Optional[str], ...]] = field(default=None, compare=False)
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Circuit:
     inputs: Set[str]
     outputs: Set[str]
@@ -33,6 +49,37 @@ class Circuit:
 class CircuitGenerator:
     """Generator for MTNCL circuits from boolean equations."""
     
+    # Operations implemented directly by threshold gates
+    _BIN_OPS = frozenset({TokenType.AND, TokenType.OR, TokenType.XOR})
+    
+    # Map operation types to MTNCL gates
+    _GATE_TYPE_MAP = {
+        TokenType.AND: "TH22",  # 2-input threshold gate
+        TokenType.OR: "TH12",   # 2-input OR gate
+        TokenType.XOR: "THXOR"  # 2-input XOR gate
+    }
+    
+    _TERNARY_GATE_TYPE_MAP = {
+        TokenType.AND: "TH33",  # 3-input threshold gate
+        TokenType.OR: "TH13",   # 3-input OR gate
+        TokenType.XOR: None     # No 3-input XOR gate
+    }
+    
+    # Alternative gates for the root operation, in order of preference.
+    # Each entry maps the left/right operand wires to the gate's input ports.
+    _ALT_VARIANTS = {
+        # For OR operation (A + B): TH12m timing variant, or TH13 with one operand on two inputs
+        TokenType.OR: [
+            ("TH12m", lambda left, right: {"A": left, "B": right}),
+            ("TH13", lambda left, right: {"A": left, "B": right, "C": left}),
+        ],
+        # For AND operation (A & B): TH22m timing variant, or TH33 with one operand on two inputs
+        TokenType.AND: [
+            ("TH22m", lambda left, right: {"A": left, "B": right}),
+            ("TH33", lambda left, right: {"A": left, "B": right, "C": left}),
+        ],
+    }
+    
     def __init__(self, gates: Dict[str, GateInfo], ast: ASTNode, config: Dict[str, any]):
         """Initialize the circuit generator.
         
@@ -47,6 +94,15 @@ class CircuitGenerator:
         self.wire_counter = 0
         self.gate_counter = 0
         
+        # The AST and gate library are fixed for the generator's lifetime,
+        # so gate availability only needs to be checked once
+        self._required_gates = self._collect_required_gates(ast)
+        self._has_required = (self._required_gates is not None and
+                              self._required_gates.issubset(self.gates.keys()))
+        
+        # Operand sub-circuits shared by all alternative implementations
+        self._alt_template = None
+        
     def generate_circuits(self, num_circuits: int) -> List[Circuit]:
         """Generate multiple circuit implementations.
         
@@ -64,29 +120,50 @@ class CircuitGenerator:
         max_attempts = 100  # Prevent infinite loops
         attempts = 0
         
+        # Generation is deterministic, so once every variant has been tried
+        # further attempts cannot produce anything new
+        max_variants = self._count_variants()
+        seen_signatures = set()
+        tried_signatures = set()
+        
         # First implementation: standard
         circuit = self._generate_single_circuit()
+        signature = self._canonical_signature(circuit)
+        tried_signatures.add(signature)
         if self._validate_circuit(circuit):
             circuits.append(circuit)
+            seen_signatures.add(signature)
         
         # Additional implementations with variations
-        while len(circuits) < num_circuits and attempts < max_attempts:
+        while (len(circuits) < num_circuits and attempts < max_attempts and
+               len(tried_signatures) < max_variants):
             attempts += 1
             # Try alternative implementations using different gate combinations
             circuit = self._generate_alternative_circuit()
-            if circuit is not None and self._validate_circuit(circuit):
+            if circuit is None:
+                break
+            signature = self._canonical_signature(circuit)
+            tried_signatures.add(signature)
+            if self._validate_circuit(circuit):
                 # Check if this implementation is unique
-                is_unique = True
-                for existing_circuit in circuits:
-                    if self._are_circuits_equivalent(circuit, existing_circuit):
-                        is_unique = False
-                        break
-                
-                if is_unique:
+                if signature not in seen_signatures:
+                    seen_signatures.add(signature)
                     circuits.append(circuit)
         
         return circuits
     
+    def _count_variants(self) -> int:
+        """Count the distinct implementations generate_circuits can produce.
+        
+        Returns:
+            1 for the standard implementation, plus 1 if an alternative root
+            gate is available
+        """
+        variants = self._ALT_VARIANTS.get(self.ast.type, ()) if isinstance(self.ast, ASTNode) else ()
+        if any(gate_type in self.gates for gate_type, _ in variants):
+            return 2
+        return 1
+    
     def _generate_single_circuit(self) -> Circuit:
         """Generate a single circuit implementation.
         
@@ -129,39 +206,68 @@ class CircuitGenerator:
         Returns:
             Name of the wire carrying the node's output
         """
-        if node.type == TokenType.VARIABLE:
-            # Input variable
-            wire_name = node.value
-            circuit.inputs.add(wire_name)
-            circuit.wires[wire_name] = Wire(name=wire_name)
-            return wire_name
+        # Post-order walk with an explicit stack; each operator node is
+        # pushed twice, the second visit combines its operands' wires
+        stack = [(node, False)]
+        wires = []
+        while stack:
+            node, operands_ready = stack.pop()
             
-        elif node.type == TokenType.NOT:
-            # NOT operations are not supported in MTNCL
-            return None
-            
-        elif node.type in (TokenType.AND, TokenType.OR, TokenType.XOR):
-            # Check if we can use a 3-input gate
-            if (node.left.type == node.type and 
-                node.left.left.type == TokenType.VARIABLE and 
-                node.left.right.type == TokenType.VARIABLE and 
-                node.right.type == TokenType.VARIABLE):
-                # Three variables with same operation
-                a_wire = self._process_node(node.left.left, circuit)
-                b_wire = self._process_node(node.left.right, circuit)
-                c_wire = self._process_node(node.right, circuit)
-                return self._add_ternary_gate(node.type, a_wire, b_wire, c_wire, circuit)
-            
-            # Binary operation gates
-            left_wire = self._process_node(node.left, circuit)
-            if left_wire is None:
-                return None
-            right_wire = self._process_node(node.right, circuit)
-            if right_wire is None:
+            if node.type == TokenType.VARIABLE:
+                wires.append(self._add_input_wire(node, circuit))
+                
+            elif node.type == TokenType.NOT:
+                # NOT operations are not supported in MTNCL
                 return None
-            return self._add_binary_gate(node.type, left_wire, right_wire, circuit)
+                
+            elif node.type in self._BIN_OPS:
+                # Check if we can use a 3-input gate
+                if (node.left.type == node.type and 
+                    node.left.left.type == TokenType.VARIABLE and 
+                    node.left.right.type == TokenType.VARIABLE and 
+                    node.right.type == TokenType.VARIABLE):
+                    # Three variables with same operation
+                    a_wire = self._add_input_wire(node.left.left, circuit)
+                    b_wire = self._add_input_wire(node.left.right, circuit)
+                    c_wire = self._add_input_wire(node.right, circuit)
+                    output_wire = self._add_ternary_gate(node.type, a_wire, b_wire, c_wire, circuit)
+                    
+                elif not operands_ready:
+                    # Visit the left operand first, then the right, then this node
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                    continue
+                    
+                else:
+                    # Binary operation gates
+                    right_wire = wires.pop()
+                    left_wire = wires.pop()
+                    output_wire = self._add_binary_gate(node.type, left_wire, right_wire, circuit)
+                    
+                if output_wire is None:
+                    return None
+                wires.append(output_wire)
+                
+            else:
+                raise ValueError(f"Unsupported node type: {node.type}")
+        
+        return wires.pop()
+    
+    def _add_input_wire(self, node: ASTNode, circuit: Circuit) -> str:
+        """Register an input variable as a primary input wire.
+        
+        Args:
+            node: VARIABLE node naming the input
+            circuit: Circuit being built
             
-        raise ValueError(f"Unsupported node type: {node.type}")
+        Returns:
+            Name of the input wire
+        """
+        wire_name = sys.intern(node.value)
+        circuit.inputs.add(wire_name)
+        circuit.wires[wire_name] = Wire(name=wire_name)
+        return wire_name
     
     def _add_binary_gate(self, op_type: TokenType, left_wire: str, right_wire: str, 
                         circuit: Circuit) -> str:
@@ -176,44 +282,11 @@ class CircuitGenerator:
         Returns:
             Name of the output wire
         """
-        output_wire = self._generate_wire_name()
-        
-        # Map operation types to MTNCL gates
-        gate_type_map = {
-            TokenType.AND: "TH22",  # 2-input threshold gate
-            TokenType.OR: "TH12",   # 2-input OR gate
-            TokenType.XOR: "THXOR"  # 2-input XOR gate
-        }
-        
-        gate_type = gate_type_map[op_type]
+        gate_type = self._GATE_TYPE_MAP[op_type]
         if gate_type not in self.gates:
             return None  # Skip if gate type not available
         
-        gate_name = self._generate_gate_name(gate_type.lower())
-        
-        # Create gate instance
-        inputs = {
-            "A": left_wire,
-            "B": right_wire
-        }
-        
-        gate = GateInstance(
-            gate_type=gate_type,
-            instance_name=gate_name,
-            inputs=inputs,
-            outputs={"Z": output_wire}
-        )
-        
-        circuit.gates.append(gate)
-        circuit.wires[output_wire] = Wire(
-            name=output_wire,
-            source=gate_name,
-            destinations=set()
-        )
-        circuit.wires[left_wire].destinations.add(gate_name)
-        circuit.wires[right_wire].destinations.add(gate_name)
-        
-        return output_wire
+        return self._emit_gate(circuit, gate_type, {"A": left_wire, "B": right_wire})
     
     def _add_ternary_gate(self, op_type: TokenType, a_wire: str, b_wire: str, c_wire: str, 
                         circuit: Circuit) -> str:
@@ -229,16 +302,7 @@ class CircuitGenerator:
         Returns:
             Name of the output wire
         """
-        output_wire = self._generate_wire_name()
-        
-        # Map operation types to MTNCL gates
-        gate_type_map = {
-            TokenType.AND: "TH33",  # 3-input threshold gate
-            TokenType.OR: "TH13",   # 3-input OR gate
-            TokenType.XOR: None     # No 3-input XOR gate
-        }
-        
-        gate_type = gate_type_map[op_type]
+        gate_type = self._TERNARY_GATE_TYPE_MAP[op_type]
         if gate_type is None or gate_type not in self.gates:
             # Fall back to binary gates if 3-input gate not available
             temp_wire = self._add_binary_gate(op_type, a_wire, b_wire, circuit)
@@ -246,43 +310,56 @@ class CircuitGenerator:
                 return None
             return self._add_binary_gate(op_type, temp_wire, c_wire, circuit)
         
-        gate_name = self._generate_gate_name(gate_type.lower())
+        return self._emit_gate(circuit, gate_type, {"A": a_wire, "B": b_wire, "C": c_wire})
+    
+    def _emit_gate(self, circuit: Circuit, gate_type: str, inputs: Dict[str, str]) -> str:
+        """Instantiate a gate and connect it to its input wires.
+        
+        Threshold gates are symmetric in their inputs, so the wires are
+        assigned to the ports in sorted order. Equivalent circuits then get
+        identical port maps however their operands were written.
         
-        # Create gate instance
-        inputs = {
-            "A": a_wire,
-            "B": b_wire,
-            "C": c_wire
-        }
+        Args:
+            circuit: Circuit being built
+            gate_type: Name of the gate to instantiate
+            inputs: Port name -> wire name for each gate input
+            
+        Returns:
+            Name of the output wire
+        """
+        inputs = dict(zip(inputs, sorted(inputs.values())))
+        output_wire = self._generate_wire_name()
+        gate_name = self._generate_gate_name(gate_type.lower())
         
         gate = GateInstance(
             gate_type=gate_type,
             instance_name=gate_name,
             inputs=inputs,
-            outputs={"Z": output_wire}
+            outputs={"Z": output_wire},
+            input_drivers=tuple(circuit.wires[w].source for w in inputs.values())
         )
         
         circuit.gates.append(gate)
         circuit.wires[output_wire] = Wire(
             name=output_wire,
             source=gate_name,
-            destinations=set()
+            destinations=[]
         )
-        circuit.wires[a_wire].destinations.add(gate_name)
-        circuit.wires[b_wire].destinations.add(gate_name)
-        circuit.wires[c_wire].destinations.add(gate_name)
+        # A wire tied to several ports of the same gate is listed once
+        for input_wire in dict.fromkeys(inputs.values()):
+            circuit.wires[input_wire].destinations.append(gate_name)
         
         return output_wire
     
     def _generate_wire_name(self) -> str:
         """Generate a unique wire name."""
-        wire_name = f"w{self.wire_counter}"
+        wire_name = _wire_name(self.wire_counter)
         self.wire_counter += 1
         return wire_name
     
     def _generate_gate_name(self, gate_type: str) -> str:
         """Generate a unique gate instance name."""
-        gate_name = f"{gate_type.lower()}{self.gate_counter}"
+        gate_name = _gate_name(gate_type, self.gate_counter)
         self.gate_counter += 1
         return gate_name
     
@@ -293,28 +370,67 @@ class CircuitGenerator:
             circuit: Circuit to analyze
             
         Returns:
-            Maximum depth of the circuit
+            Maximum depth of the circuit, or -1 if its gates form a cycle
         """
-        # Create a directed graph
-        graph = nx.DiGraph()
+        if any(gate.input_drivers is None for gate in circuit.gates):
+            # Gates built outside the generator have no cached drivers and
+            # may be in any order
+            return self._calculate_depth_unordered(circuit)
+        
+        # Gates are emitted in post-order, so every driving gate is visited
+        # before the gates it feeds and a single pass yields the longest path.
+        depth = {}
+        for gate in circuit.gates:
+            level = 0
+            for driving_gate in gate.input_drivers:
+                if driving_gate in depth and depth[driving_gate] > level:
+                    level = depth[driving_gate]
+            depth[gate.instance_name] = level + 1
         
-        # Add edges for all connections
+        return max(depth.values(), default=0)
+    
+    def _calculate_depth_unordered(self, circuit: Circuit) -> int:
+        """Calculate the depth of a circuit whose gates may be in any order.
+        
+        Args:
+            circuit: Circuit to analyze
+            
+        Returns:
+            Maximum depth of the circuit, or -1 if its gates form a cycle
+        """
+        drivers = {}
         for gate in circuit.gates:
-            for input_port, input_wire in gate.inputs.items():
-                if input_wire in circuit.inputs:
-                    # Edge from input to gate
-                    graph.add_edge(input_wire, gate.instance_name)
+            drivers[gate.instance_name] = [
+                circuit.wires[w].source for w in gate.inputs.values()
+                if w not in circuit.inputs
+            ]
+        
+        # Iterative depth-first search; a driver still on the current path
+        # means the gates form a cycle
+        depth = {}
+        on_path = set()
+        for root in drivers:
+            if root in depth:
+                continue
+            stack = [(root, iter(drivers[root]))]
+            on_path.add(root)
+            while stack:
+                name, pending = stack[-1]
+                for driving_gate in pending:
+                    if driving_gate in on_path:
+                        return -1
+                    if driving_gate in drivers and driving_gate not in depth:
+                        stack.append((driving_gate, iter(drivers[driving_gate])))
+                        on_path.add(driving_gate)
+                        break
                 else:
-                    # Edge from driving gate to this gate
-                    driving_gate = circuit.wires[input_wire].source
-                    graph.add_edge(driving_gate, gate.instance_name)
-        
-        # Calculate longest path
-        try:
-            return nx.dag_longest_path_length(graph)
-        except nx.NetworkXError:
-            # Handle case of cyclic graph (should not happen in valid circuit)
-            return -1
+                    stack.pop()
+                    on_path.discard(name)
+                    depth[name] = 1 + max(
+                        (depth[d] for d in drivers[name] if d in depth), default=0
+                    )
+        
+        return max(depth.values(), default=0)
     
     def _validate_circuit(self, circuit: Circuit) -> bool:
         """Validate a generated circuit.
@@ -328,22 +444,6 @@ class CircuitGenerator:
         if circuit is None:
             return False
         
-        # Check gate fanout constraints
-        max_fanout = self.config['gate_constraints']['max_fanout']
-        
-        # Count fanout for each wire
-        fanout_count = {wire_name: 0 for wire_name in circuit.wires}
-        
-        # Count how many times each wire is used as an input to gates
-        for gate in circuit.gates:
-            for input_port, wire_name in gate.inputs.items():
-                fanout_count[wire_name] = fanout_count.get(wire_name, 0) + 1
-        
-        # Check if any wire exceeds the maximum fanout
-        for wire_name, count in fanout_count.items():
-            if count > max_fanout:
-                return False
-            
         # Check circuit depth constraints
         max_depth = self.config['gate_constraints']['max_depth']
         if circuit.depth > max_depth:
@@ -355,25 +455,29 @@ class CircuitGenerator:
         if self.config['max_gates'] is not None and len(circuit.gates) > self.config['max_gates']:
             return False
         
-        # Check gate type constraints
-        if 'gates' in self.config:
-            # Check if any avoided gates are used
-            avoid_gates = set(self.config['gates'].get('avoid', []))
-            for gate in circuit.gates:
-                if gate.gate_type in avoid_gates:
-                    return False
-                
-            # Check if preferred gates are used when possible
-            preferred_gates = set(self.config['gates'].get('preferred', []))
-            if preferred_gates:
-                has_preferred = False
-                for gate in circuit.gates:
-                    if gate.gate_type in preferred_gates:
-                        has_preferred = True
-                        break
-                if not has_preferred and any(g in self.gates for g in preferred_gates):
+        max_fanout = self.config['gate_constraints']['max_fanout']
+        gate_prefs = self.config.get('gates', {})
+        avoid_gates = set(gate_prefs.get('avoid', []))
+        preferred_gates = set(gate_prefs.get('preferred', []))
+        has_preferred = False
+        
+        # Check gate types and fanout in a single pass over the gates
+        fanout_count = {}
+        for gate in circuit.gates:
+            if gate.gate_type not in self.gates or gate.gate_type in avoid_gates:
+                return False
+            if gate.gate_type in preferred_gates:
+                has_preferred = True
+            for wire_name in gate.inputs.values():
+                count = fanout_count.get(wire_name, 0) + 1
+                if count > max_fanout:
                     return False
-                
+                fanout_count[wire_name] = count
+        
+        # Check if preferred gates are used when possible
+        if preferred_gates and not has_preferred and any(g in self.gates for g in preferred_gates):
+            return False
+        
         return True
 
     def _are_circuits_equivalent(self, circuit1: Circuit, circuit2: Circuit) -> bool:
@@ -386,28 +490,27 @@ class CircuitGenerator:
         Returns:
             True if circuits are equivalent, False otherwise
         """
-        if len(circuit1.gates) != len(circuit2.gates):
-            return False
-        
-        if circuit1.inputs != circuit2.inputs:
-            return False
-        
-        if circuit1.outputs != circuit2.outputs:
-            return False
-        
-        # Compare gates (ignoring instance names)
-        gates1 = sorted(circuit1.gates, key=lambda g: (g.gate_type, sorted(g.inputs.values()), sorted(g.outputs.values())))
-        gates2 = sorted(circuit2.gates, key=lambda g: (g.gate_type, sorted(g.inputs.values()), sorted(g.outputs.values())))
+        return self._canonical_signature(circuit1) == self._canonical_signature(circuit2)
+    
+    def _canonical_signature(self, circuit: Circuit) -> Tuple:
+        """Build a hashable structural signature of a circuit.
         
-        for g1, g2 in zip(gates1, gates2):
-            if g1.gate_type != g2.gate_type:
-                return False
-            if sorted(g1.inputs.values()) != sorted(g2.inputs.values()):
-                return False
-            if sorted(g1.outputs.values()) != sorted(g2.outputs.values()):
-                return False
+        Two circuits with the same signature use the same gate types wired to
+        the same ports, regardless of gate order or instance names. _emit_gate
+        assigns input wires to ports in sorted order, so port maps are
+        compared as-is.
         
-        return True 
+        Args:
+            circuit: Circuit to summarize
+            
+        Returns:
+            Tuple usable as a set member or dictionary key
+        """
+        gates = tuple(sorted(
+            (g.gate_type, tuple(g.inputs.values()), tuple(g.outputs.values()))
+            for g in circuit.gates
+        ))
+        return (frozenset(circuit.inputs), frozenset(circuit.outputs), gates)
 
     def _generate_alternative_circuit(self) -> Optional[Circuit]:
         """Generate an alternative circuit implementation using different gates.
@@ -415,6 +518,51 @@ class CircuitGenerator:
         Returns:
             A Circuit object representing an alternative implementation, or None if not possible
         """
+        variants = self._ALT_VARIANTS.get(self.ast.type) if isinstance(self.ast, ASTNode) else None
+        if not variants:
+            return None
+        
+        # The operand sub-circuits are the same for every variant, so build
+        # them once and only re-emit the root gate on each call
+        if self._alt_template is None:
+            self._alt_template = self._build_operand_template()
+        template, left_wire, right_wire, wire_counter, gate_counter = self._alt_template
+        
+        if left_wire is None or right_wire is None:
+            return None
+        
+        circuit = self._copy_circuit(template)
+        self.wire_counter = wire_counter
+        self.gate_counter = gate_counter
+        
+        # Double up the same operand however the equation orders them, so
+        # that HVDD and LVDD variants share their wiring
+        left_wire, right_wire = sorted((left_wire, right_wire))
+        
+        # Use the first variant whose gate is available
+        for gate_type, build_ports in variants:
+            if gate_type in self.gates:
+                output_wire = self._emit_gate(circuit, gate_type, build_ports(left_wire, right_wire))
+                
+                # Add circuit output
+                circuit.outputs.add(output_wire)
+                
+                # Calculate circuit metrics
+                circuit.depth = self._calculate_depth(circuit)
+                circuit.gate_count = len(circuit.gates)
+                
+                return circuit
+        
+        return None
+
+    def _build_operand_template(self) -> Tuple[Circuit, Optional[str], Optional[str], int, int]:
+        """Build the sub-circuits feeding the root operation.
+        
+        Returns:
+            Tuple of the partial circuit, the left and right operand wires
+            (None if an operand cannot be built), and the wire and gate
+            counters to resume from
+        """
         # Reset counters for new circuit
         self.wire_counter = 0
         self.gate_counter = 0
@@ -429,177 +577,68 @@ class CircuitGenerator:
             gate_count=0
         )
         
-        # For OR operation (A + B), we can use different threshold gates:
-        # 1. TH12 (standard implementation)
-        # 2. TH12m (modified timing variant)
-        # 3. TH13 with both inputs connected
-        if isinstance(self.ast, ASTNode) and self.ast.type == TokenType.OR:
-            # Get input wires
-            left_wire = self._process_node(self.ast.left, circuit)
-            right_wire = self._process_node(self.ast.right, circuit)
-            
-            if left_wire is None or right_wire is None:
-                return None
-            
-            # Try using TH12m gate if available
-            if "TH12m" in self.gates:
-                output_wire = self._generate_wire_name()
-                gate_name = self._generate_gate_name("th12m")
-                
-                gate = GateInstance(
-                    gate_type="TH12m",
-                    instance_name=gate_name,
-                    inputs={"A": left_wire, "B": right_wire},
-                    outputs={"Z": output_wire}
-                )
-                
-                circuit.gates.append(gate)
-                circuit.wires[output_wire] = Wire(
-                    name=output_wire,
-                    source=gate_name,
-                    destinations=set()
-                )
-                circuit.wires[left_wire].destinations.add(gate_name)
-                circuit.wires[right_wire].destinations.add(gate_name)
-                
-                # Add circuit output
-                circuit.outputs.add(output_wire)
-                
-                # Calculate circuit metrics
-                circuit.depth = self._calculate_depth(circuit)
-                circuit.gate_count = len(circuit.gates)
-                
-                return circuit
-                
-            # Try using TH13 gate if available
-            elif "TH13" in self.gates:
-                output_wire = self._generate_wire_name()
-                gate_name = self._generate_gate_name("th13")
-                
-                gate = GateInstance(
-                    gate_type="TH13",
-                    instance_name=gate_name,
-                    inputs={"A": left_wire, "B": right_wire, "C": left_wire},  # Connect C to A for equivalent function
-                    outputs={"Z": output_wire}
-                )
-                
-                circuit.gates.append(gate)
-                circuit.wires[output_wire] = Wire(
-                    name=output_wire,
-                    source=gate_name,
-                    destinations=set()
-                )
-                circuit.wires[left_wire].destinations.add(gate_name)
-                circuit.wires[right_wire].destinations.add(gate_name)
-                
-                # Add circuit output
-                circuit.outputs.add(output_wire)
-                
-                # Calculate circuit metrics
-                circuit.depth = self._calculate_depth(circuit)
-                circuit.gate_count = len(circuit.gates)
-                
-                return circuit
+        # Get input wires
+        left_wire = self._process_node(self.ast.left, circuit)
+        right_wire = self._process_node(self.ast.right, circuit)
         
-        # For AND operation (A & B), we can use:
-        # 1. TH22 (standard implementation)
-        # 2. TH22m (modified timing variant)
-        # 3. TH33 with one input duplicated
-        elif isinstance(self.ast, ASTNode) and self.ast.type == TokenType.AND:
-            # Get input wires
-            left_wire = self._process_node(self.ast.left, circuit)
-            right_wire = self._process_node(self.ast.right, circuit)
-            
-            if left_wire is None or right_wire is None:
-                return None
-            
-            # Try using TH22m gate if available
-            if "TH22m" in self.gates:
-                output_wire = self._generate_wire_name()
-                gate_name = self._generate_gate_name("th22m")
-                
-                gate = GateInstance(
-                    gate_type="TH22m",
-                    instance_name=gate_name,
-                    inputs={"A": left_wire, "B": right_wire},
-                    outputs={"Z": output_wire}
-                )
-                
-                circuit.gates.append(gate)
-                circuit.wires[output_wire] = Wire(
-                    name=output_wire,
-                    source=gate_name,
-                    destinations=set()
-                )
-                circuit.wires[left_wire].destinations.add(gate_name)
-                circuit.wires[right_wire].destinations.add(gate_name)
-                
-                # Add circuit output
-                circuit.outputs.add(output_wire)
-                
-                # Calculate circuit metrics
-                circuit.depth = self._calculate_depth(circuit)
-                circuit.gate_count = len(circuit.gates)
-                
-                return circuit
-                
-            # Try using TH33 gate if available
-            elif "TH33" in self.gates:
-                output_wire = self._generate_wire_name()
-                gate_name = self._generate_gate_name("th33")
-                
-                gate = GateInstance(
-                    gate_type="TH33",
-                    instance_name=gate_name,
-                    inputs={"A": left_wire, "B": right_wire, "C": left_wire},  # Connect C to A for equivalent function
-                    outputs={"Z": output_wire}
-                )
-                
-                circuit.gates.append(gate)
-                circuit.wires[output_wire] = Wire(
-                    name=output_wire,
-                    source=gate_name,
-                    destinations=set()
-                )
-                circuit.wires[left_wire].destinations.add(gate_name)
-                circuit.wires[right_wire].destinations.add(gate_name)
-                
-                # Add circuit output
-                circuit.outputs.add(output_wire)
-                
-                # Calculate circuit metrics
-                circuit.depth = self._calculate_depth(circuit)
-                circuit.gate_count = len(circuit.gates)
-                
-                return circuit
+        return circuit, left_wire, right_wire, self.wire_counter, self.gate_counter
+    
+    def _copy_circuit(self, circuit: Circuit) -> Circuit:
+        """Copy a circuit so that new gates can be added without touching the original.
         
-        return None
-
+        Gates and wires are copied along with their port and destination
+        containers, so callers may modify the returned circuit freely.
+        
+        Args:
+            circuit: Circuit to copy
+            
+        Returns:
+            Independent copy of the circuit
+        """
+        return Circuit(
+            inputs=set(circuit.inputs),
+            outputs=set(circuit.outputs),
+            gates=[
+                replace(gate, inputs=dict(gate.inputs), outputs=dict(gate.outputs))
+                for gate in circuit.gates
+            ],
+            wires={
+                name: Wire(name=wire.name, source=wire.source, destinations=list(wire.destinations))
+                for name, wire in circuit.wires.items()
+            },
+            depth=circuit.depth,
+            gate_count=circuit.gate_count
+        )
+    
     def _has_required_gates(self) -> bool:
         """Check if all required gates are available for any implementation.
         
         Returns:
             True if all required gates are available, False otherwise
         """
-        def check_node(node: ASTNode) -> bool:
-            if node.type == TokenType.VARIABLE:
-                return True
+        return self._has_required
+    
+    def _collect_required_gates(self, node: ASTNode) -> Optional[FrozenSet[str]]:
+        """Collect the basic gate types needed to implement an AST.
+        
+        Args:
+            node: Root of the AST to inspect
             
-            elif node.type == TokenType.NOT:
+        Returns:
+            Frozenset of required gate names, or None if the AST uses an
+            unsupported operation
+        """
+        required = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.type == TokenType.VARIABLE:
+                continue
+            if node.type not in self._BIN_OPS:
                 # NOT operations are not supported
-                return False
-            
-            elif node.type == TokenType.AND:
-                return ("TH22" in self.gates and 
-                       check_node(node.left) and check_node(node.right))
-            
-            elif node.type == TokenType.OR:
-                return ("TH12" in self.gates and 
-                       check_node(node.left) and check_node(node.right))
-            
-            elif node.type == TokenType.XOR:
-                return "THXOR" in self.gates and check_node(node.left) and check_node(node.right)
-            
-            return False
+                return None
+            required.add(self._GATE_TYPE_MAP[node.type])
+            stack.append(node.left)
+            stack.append(node.right)
         
-        return check_node(self.ast) 
\ No newline at end of file
+        return frozenset(required)
@@ -1,21 +1,105 @@
 #!/usr/bin/env python3
 
 import argparse
+import hashlib
 import json
 import logging
 import os
+import pickle
+from collections import Counter
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the standard library
+    _json_loads = json.loads
+
+from . import __version__
 from .parsers.vhdl_parser import parse_vhdl_gates
-from .parsers.boolean_parser import parse_boolean_equation
+from .parsers.boolean_parser import parse_boolean_equation_cached
 from .core.circuit_generator import CircuitGenerator
-from .core.polymorphic_generator import PolymorphicCircuitGenerator
 from .writers.verilog_writer import write_verilog_netlist
 
+# Part of every on-disk cache key; bump it whenever parser output or the
+# layout of cached classes changes so that stale pickles are not reused
+_CACHE_SCHEMA = 1
+
 def load_config(config_path: str) -> Dict:
     """Load configuration from JSON file."""
-    with open(config_path, 'r') as f:
-        return json.load(f)
+    with open(config_path, 'rb') as f:
+        return _json_loads(f.read())
+
+def _gate_cache_dir() -> str:
+    """Get the directory holding cached gate libraries."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_home, 'mtncl')
+
+def _load_gates_cached(gate_files: List[str]) -> Dict:
+    """Parse VHDL gate files, reusing an on-disk copy while the files are unchanged.
+    
+    The cache is keyed on each file's path, modification time and size, so
+    editing any gate file triggers a fresh parse, and on the package version
+    and cache schema, so caches written by other code are ignored.
+    
+    Args:
+        gate_files: List of VHDL files with gate definitions
+        
+    Returns:
+        Dictionary mapping gate names to their GateInfo objects
+        
+    Raises:
+        FileNotFoundError: If a VHDL file cannot be found
+        ValueError: If VHDL syntax is invalid
+    """
+    stats = []
+    for gate_file in gate_files:
+        stat = os.stat(gate_file)
+        stats.append((os.path.abspath(gate_file), stat.st_mtime_ns, stat.st_size))
+    key_data = (__version__, _CACHE_SCHEMA, stats)
+    key = hashlib.blake2b(repr(key_data).encode(), digest_size=16).hexdigest()
+    cache_path = os.path.join(_gate_cache_dir(), f'{key}.pkl')
+    
+    # Any unreadable or unloadable cache entry is treated as a miss
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        if not isinstance(e, FileNotFoundError):
+            logging.debug(f"Ignoring unusable gate cache: {e}")
+    
+    gates_dict = _parse_gate_files(gate_files)
+    
+    # The cache is only an optimization; failing to write it is not an error
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(gates_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.debug(f"Could not cache gate library: {e}")
+    
+    return gates_dict
+
+def _parse_gate_files(gate_files: List[str]) -> Dict:
+    """Parse VHDL gate files into one gate dictionary.
+    
+    Several files are read on worker threads so that their I/O overlaps;
+    later files still override gates of the same name from earlier ones.
+    """
+    if len(gate_files) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=min(8, len(gate_files))) as executor:
+            parsed = list(executor.map(parse_vhdl_gates, gate_files))
+    else:
+        parsed = [parse_vhdl_gates(gate_file) for gate_file in gate_files]
+    
+    gates_dict = {}
+    for gates in parsed:
+        gates_dict.update(gates)
+    return gates_dict
 
 def setup_logging(level: str = 'INFO') -> None:
     """Configure logging."""
@@ -43,83 +127,144 @@ def parse_args() -> argparse.Namespace:
 def generate_regular_documentation(output_dir: str, circuits: List, config: Dict) -> None:
     """Generate documentation for regular MTNCL circuit generation results."""
     doc_path = os.path.join(output_dir, 'README.md')
-    with open(doc_path, 'w') as f:
-        f.write('# MTNCL Circuit Generation Results\n\n')
-        
-        # Configuration summary
-        f.write('## Configuration\n\n')
-        f.write(f"Boolean Equation: {config['input']['equation']}\n\n")
+    parts = ['# MTNCL Circuit Generation Results\n\n']
+    
+    # Configuration summary
+    parts.append('## Configuration\n\n')
+    parts.append(f"Boolean Equation: {config['input']['equation']}\n\n")
+    
+    # Circuit implementations
+    parts.append('## Generated Circuits\n\n')
+    for i, circuit in enumerate(circuits):
+        parts.append(f'### Circuit {i}\n\n')
+        parts.append(f"Gate Count: {circuit.gate_count}\n")
+        parts.append(f"Circuit Depth: {circuit.depth}\n")
+        parts.append('\nGates Used:\n')
+        gate_types = Counter(gate.gate_type for gate in circuit.gates)
         
-        # Circuit implementations
-        f.write('## Generated Circuits\n\n')
-        for i, circuit in enumerate(circuits):
-            f.write(f'### Circuit {i}\n\n')
-            f.write(f"Gate Count: {circuit.gate_count}\n")
-            f.write(f"Circuit Depth: {circuit.depth}\n")
-            f.write('\nGates Used:\n')
-            gate_types = {}
-            for gate in circuit.gates:
-                gate_type = gate.gate_type
-                gate_types[gate_type] = gate_types.get(gate_type, 0) + 1
-            
-            for gate_type, count in gate_types.items():
-                f.write(f"- {gate_type}: {count}\n")
-            f.write('\n')
+        for gate_type, count in gate_types.items():
+            parts.append(f"- {gate_type}: {count}\n")
+        parts.append('\n')
+    
+    # Write the document in one call rather than one per line
+    with open(doc_path, 'w') as f:
+        f.write(''.join(parts))
+
+def _describe_polymorphic_dict(parts: List[str], circuit: Dict) -> None:
+    """Append the documentation of a polymorphic circuit dictionary."""
+    parts.append(f"Gate Count: {len(circuit['gates'])}\n")
+    parts.append(f"Inputs: {', '.join(circuit['inputs'])}\n")
+    parts.append(f"Outputs: {', '.join(circuit['outputs'])}\n")
+    parts.append(f"HVDD Function: {circuit.get('hvdd_function', '')}\n")
+    parts.append(f"LVDD Function: {circuit.get('lvdd_function', '')}\n")
+    
+    parts.append('\nPolymorphic Gates Used:\n')
+    gate_types = Counter(gate['type'] for gate in circuit['gates'])
+    
+    for gate_type, count in gate_types.items():
+        parts.append(f"- {gate_type}: {count}\n")
+
+def _describe_gate_objects(parts: List[str], circuit) -> None:
+    """Append the polymorphic gate histogram of a circuit object."""
+    parts.append('\nPolymorphic Gates Used:\n')
+    gate_types = Counter(gate.gate_type for gate in circuit.gates)
+    
+    for gate_type, count in gate_types.items():
+        parts.append(f"- {gate_type}: {count}\n")
+
+def _describe_dual_circuit(parts: List[str], circuit) -> None:
+    """Append the documentation of an object holding HVDD and LVDD circuits."""
+    parts.append(f"HVDD Gate Count: {circuit.hvdd_circuit.gate_count}\n")
+    parts.append(f"LVDD Gate Count: {circuit.lvdd_circuit.gate_count}\n")
+    parts.append(f"HVDD Circuit Depth: {circuit.hvdd_circuit.depth}\n")
+    parts.append(f"LVDD Circuit Depth: {circuit.lvdd_circuit.depth}\n")
+    _describe_gate_objects(parts, circuit)
+
+def _describe_circuit(parts: List[str], circuit) -> None:
+    """Append the documentation of a single Circuit object."""
+    parts.append(f"Gate Count: {circuit.gate_count}\n")
+    parts.append(f"Circuit Depth: {circuit.depth}\n")
+    _describe_gate_objects(parts, circuit)
 
 def generate_polymorphic_documentation(output_dir: str, circuits: List, config: Dict) -> None:
     """Generate documentation for polymorphic circuit generation results."""
     doc_path = os.path.join(output_dir, 'README.md')
-    with open(doc_path, 'w') as f:
-        f.write('# Polymorphic MTNCL Circuit Generation Results\n\n')
-        
-        # Configuration summary
-        f.write('## Configuration\n\n')
-        f.write(f"HVDD Function: {config['input']['hvdd_equation']}\n")
-        f.write(f"LVDD Function: {config['input']['lvdd_equation']}\n\n")
+    parts = ['# Polymorphic MTNCL Circuit Generation Results\n\n']
+    
+    # Configuration summary
+    parts.append('## Configuration\n\n')
+    parts.append(f"HVDD Function: {config['input']['hvdd_equation']}\n")
+    parts.append(f"LVDD Function: {config['input']['lvdd_equation']}\n\n")
+    
+    # Circuit implementations; generators return a single format, so it is
+    # detected once from the first circuit
+    parts.append('## Generated Circuits\n\n')
+    if circuits:
+        first = circuits[0]
+        if isinstance(first, dict):
+            describe = _describe_polymorphic_dict
+        elif hasattr(first, 'hvdd_circuit') and hasattr(first, 'lvdd_circuit'):
+            describe = _describe_dual_circuit
+        else:
+            describe = _describe_circuit
         
-        # Circuit implementations
-        f.write('## Generated Circuits\n\n')
         for i, circuit in enumerate(circuits):
-            f.write(f'### Circuit {i}\n\n')
-            
-            # Handle both object and dictionary formats
-            if isinstance(circuit, dict):
-                # Dictionary format
-                f.write(f"Gate Count: {len(circuit['gates'])}\n")
-                f.write(f"Inputs: {', '.join(circuit['inputs'])}\n")
-                f.write(f"Outputs: {', '.join(circuit['outputs'])}\n")
-                f.write(f"HVDD Function: {circuit.get('hvdd_function', '')}\n")
-                f.write(f"LVDD Function: {circuit.get('lvdd_function', '')}\n")
-                
-                f.write('\nPolymorphic Gates Used:\n')
-                gate_types = {}
-                for gate in circuit['gates']:
-                    gate_type = gate['type']
-                    gate_types[gate_type] = gate_types.get(gate_type, 0) + 1
-                
-                for gate_type, count in gate_types.items():
-                    f.write(f"- {gate_type}: {count}\n")
-            else:
-                # Object format
-                if hasattr(circuit, 'hvdd_circuit') and hasattr(circuit, 'lvdd_circuit'):
-                    f.write(f"HVDD Gate Count: {circuit.hvdd_circuit.gate_count}\n")
-                    f.write(f"LVDD Gate Count: {circuit.lvdd_circuit.gate_count}\n")
-                    f.write(f"HVDD Circuit Depth: {circuit.hvdd_circuit.depth}\n")
-                    f.write(f"LVDD Circuit Depth: {circuit.lvdd_circuit.depth}\n")
-                else:
-                    f.write(f"Gate Count: {circuit.gate_count}\n")
-                    f.write(f"Circuit Depth: {circuit.depth}\n")
-                
-                f.write('\nPolymorphic Gates Used:\n')
-                gate_types = {}
-                for gate in circuit.gates:
-                    gate_type = gate.gate_type
-                    gate_types[gate_type] = gate_types.get(gate_type, 0) + 1
-                
-                for gate_type, count in gate_types.items():
-                    f.write(f"- {gate_type}: {count}\n")
-            
-            f.write('\n')
+            parts.append(f'### Circuit {i}\n\n')
+            describe(parts, circuit)
+            parts.append('\n')
+    
+    # Write the document in one call rather than one per line
+    with open(doc_path, 'w') as f:
+        f.write(''.join(parts))
+
+def _write_circuit_files(file_stem: str, circuit, generate_testbench: bool) -> None:
+    """Write the netlist and, if requested, the testbench of one circuit.
+    
+    Args:
+        file_stem: Output path without extension, e.g. 'output/circuit_0'
+        circuit: Circuit object or dictionary to write
+        generate_testbench: Whether to generate a testbench
+    """
+    write_verilog_netlist(circuit, f'{file_stem}.v')
+    
+    if generate_testbench:
+        write_verilog_netlist(circuit, f'{file_stem}_tb.v', is_testbench=True)
+
+def _write_circuits(output_dir: str, circuits: List, generate_testbench: bool) -> None:
+    """Write output files for all circuits.
+    
+    Args:
+        output_dir: Directory to store generated files
+        circuits: Generated circuits, as Circuit objects or dictionaries
+        generate_testbench: Whether to generate testbenches
+    """
+    # Join the directory once; only the circuit index varies per file
+    prefix = os.path.join(output_dir, 'circuit_')
+    for i, circuit in enumerate(circuits):
+        _write_circuit_files(f'{prefix}{i}', circuit, generate_testbench)
+
+def _generator_config(config: Dict, is_polymorphic: bool) -> Dict:
+    """Build the circuit generator configuration from a full configuration.
+    
+    Args:
+        config: Configuration as loaded from a JSON configuration file
+        is_polymorphic: Whether the configuration is for polymorphic generation
+        
+    Returns:
+        Configuration dictionary for CircuitGenerator or PolymorphicCircuitGenerator
+    """
+    constraints = config.get('constraints', {})
+    generator_config = {
+        'gate_constraints': {'max_depth': 10, 'max_fanout': 4, **constraints},
+        'min_gates': constraints.get('min_gates'),
+        'max_gates': constraints.get('max_gates'),
+        'gates': config.get('gates', {})
+    }
+    if is_polymorphic:
+        polymorphic = config.get('polymorphic', {})
+        generator_config['use_direct_mapping'] = polymorphic.get('use_direct_mapping', True)
+        generator_config['use_alternative_mapping'] = polymorphic.get('use_alternative_mapping', True)
+    return generator_config
 
 def generate_mtncl_circuits(
     equation: Optional[str] = None,
@@ -130,7 +275,8 @@ def generate_mtncl_circuits(
     num_circuits: int = 1,
     is_polymorphic: bool = False,
     generate_docs: bool = True,
-    generate_testbench: bool = False
+    generate_testbench: bool = False,
+    config: Optional[Dict] = None
 ) -> List[Dict]:
     """Generate MTNCL circuits from boolean equations.
     
@@ -144,6 +290,8 @@ def generate_mtncl_circuits(
         is_polymorphic: Whether to generate polymorphic circuits
         generate_docs: Whether to generate documentation
         generate_testbench: Whether to generate testbenches
+        config: Configuration file contents providing constraints and gate
+            preferences; generator defaults are used if omitted
         
     Returns:
         List of generated circuit dictionaries
@@ -151,75 +299,71 @@ def generate_mtncl_circuits(
     Raises:
         ValueError: If required parameters are missing or invalid
     """
+    # Determine the mode and validate its equations before any file work
+    is_polymorphic = is_polymorphic or (hvdd_equation and lvdd_equation)
+    
+    if is_polymorphic:
+        if not hvdd_equation or not lvdd_equation:
+            raise ValueError("Both HVDD and LVDD equations are required for polymorphic generation")
+    elif not equation:
+        raise ValueError("Boolean equation is required for regular circuit generation")
+    
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
     
     # Parse gate definitions
-    gates_dict = {}
-    if gate_files:
-        for gate_file in gate_files:
-            gates_dict.update(parse_vhdl_gates(gate_file))
+    gates_dict = _load_gates_cached(gate_files) if gate_files else {}
     
     # Generate circuits based on mode
-    is_polymorphic = is_polymorphic or (hvdd_equation and lvdd_equation)
-    
     if is_polymorphic:
-        # Validate required equations
-        if not hvdd_equation or not lvdd_equation:
-            raise ValueError("Both HVDD and LVDD equations are required for polymorphic generation")
-            
+        # Only polymorphic runs need this module, so it is imported on demand
+        from .core.polymorphic_generator import PolymorphicCircuitGenerator
+        
         # Generate polymorphic circuits
         generator = PolymorphicCircuitGenerator(
             gates_dict,
             hvdd_equation,
-            lvdd_equation
+            lvdd_equation,
+            _generator_config(config, True) if config is not None else None
         )
-        circuits = generator.generate_circuits()
+        circuits = generator.generate_circuits(num_circuits)
         
         if not circuits:
             raise ValueError("No valid polymorphic implementations found")
             
         # Generate documentation
         if generate_docs:
-            config = {
+            doc_config = {
                 'input': {
                     'hvdd_equation': hvdd_equation,
                     'lvdd_equation': lvdd_equation
                 }
             }
-            generate_polymorphic_documentation(output_dir, circuits, config)
+            generate_polymorphic_documentation(output_dir, circuits, doc_config)
     else:
-        # Validate required equation
-        if not equation:
-            raise ValueError("Boolean equation is required for regular circuit generation")
-            
-        # Generate regular MTNCL circuits
+        # Generate regular MTNCL circuits; AST nodes are immutable, so the
+        # cached parse can be shared with other callers
         generator = CircuitGenerator(
             gates_dict,
-            equation
+            parse_boolean_equation_cached(equation),
+            _generator_config(config or {}, False)
         )
-        circuits = generator.generate_circuits()
+        circuits = generator.generate_circuits(num_circuits)
         
         if not circuits:
             raise ValueError("No valid circuits generated")
             
         # Generate documentation
         if generate_docs:
-            config = {
+            doc_config = {
                 'input': {
                     'equation': equation
                 }
             }
-            generate_regular_documentation(output_dir, circuits, config)
+            generate_regular_documentation(output_dir, circuits, doc_config)
     
     # Generate output files
-    for i, circuit in enumerate(circuits):
-        output_file = os.path.join(output_dir, f'circuit_{i}.v')
-        write_verilog_netlist(circuit, output_file)
-        
-        if generate_testbench:
-            tb_file = os.path.join(output_dir, f'circuit_{i}_tb.v')
-            write_verilog_netlist(circuit, tb_file, is_testbench=True)
+    _write_circuits(output_dir, circuits, generate_testbench)
     
     return circuits
 
@@ -247,92 +391,32 @@ def main() -> None:
         config['output']['directory'] = args.output_dir
     if args.polymorphic:
         config['mode'] = 'polymorphic'
-        
-    # Ensure output directory exists
-    os.makedirs(config['output']['directory'], exist_ok=True)
     
-    # Parse gate definitions
-    gates_dict = {}
+    is_polymorphic = config.get('mode') == 'polymorphic' or bool(args.hvdd_equation and args.lvdd_equation)
     gate_files = config['input']['gates_dir']
     if isinstance(gate_files, str):
         gate_files = [gate_files]
-    for gate_file in gate_files:
-        gates_dict.update(parse_vhdl_gates(gate_file))
-    
-    # Generate circuits based on mode
-    is_polymorphic = config.get('mode') == 'polymorphic' or (args.hvdd_equation and args.lvdd_equation)
+    output_dir = config['output']['directory']
     
-    if is_polymorphic:
-        # Validate required equations
-        if not config['input'].get('hvdd_equation') or not config['input'].get('lvdd_equation'):
-            logging.error("Both HVDD and LVDD equations are required for polymorphic generation")
-            return
-            
-        # Generate polymorphic circuits
-        polymorphic_config = {
-            'use_direct_mapping': config.get('polymorphic', {}).get('use_direct_mapping', True),
-            'use_alternative_mapping': config.get('polymorphic', {}).get('use_alternative_mapping', True),
-            'gate_constraints': config.get('constraints', {}),
-            'min_gates': config.get('constraints', {}).get('min_gates'),
-            'max_gates': config.get('constraints', {}).get('max_gates'),
-            'gates': config.get('gates', {})
-        }
-        
-        generator = PolymorphicCircuitGenerator(
-            gates_dict,
-            config['input']['hvdd_equation'],
-            config['input']['lvdd_equation'],
-            polymorphic_config
-        )
-        circuits = generator.generate_circuits(config['input'].get('num_circuits', 1))
-        
-        if not circuits:
-            logging.error("No valid polymorphic implementations found")
-            return
-            
-        # Generate documentation
-        if config.get('documentation', {}).get('format') == 'markdown':
-            generate_polymorphic_documentation(config['output']['directory'], circuits, config)
-    else:
-        # Validate required equation
-        if not config['input'].get('equation'):
-            logging.error("Boolean equation is required for regular circuit generation")
-            return
-            
-        # Generate regular MTNCL circuits
-        circuit_config = {
-            'gate_constraints': config.get('constraints', {}),
-            'min_gates': config.get('constraints', {}).get('min_gates'),
-            'max_gates': config.get('constraints', {}).get('max_gates'),
-            'gates': config.get('gates', {})
-        }
-        
-        ast = parse_boolean_equation(config['input']['equation'])
-        generator = CircuitGenerator(
-            gates_dict,
-            ast,
-            circuit_config
+    # Generation itself is shared with the library entry point
+    try:
+        circuits = generate_mtncl_circuits(
+            equation=config['input'].get('equation'),
+            hvdd_equation=config['input'].get('hvdd_equation') if is_polymorphic else None,
+            lvdd_equation=config['input'].get('lvdd_equation') if is_polymorphic else None,
+            gate_files=gate_files,
+            output_dir=output_dir,
+            num_circuits=config['input'].get('num_circuits', 1),
+            is_polymorphic=is_polymorphic,
+            generate_docs=config.get('documentation', {}).get('format') == 'markdown',
+            generate_testbench=config['output'].get('generate_testbench', False),
+            config=config
         )
-        circuits = generator.generate_circuits(config['input'].get('num_circuits', 1))
-        
-        if not circuits:
-            logging.error("No valid circuits generated")
-            return
-            
-        # Generate documentation
-        if config.get('documentation', {}).get('format') == 'markdown':
-            generate_regular_documentation(config['output']['directory'], circuits, config)
-    
-    # Generate output files
-    for i, circuit in enumerate(circuits):
-        output_file = os.path.join(config['output']['directory'], f'circuit_{i}.v')
-        write_verilog_netlist(circuit, output_file)
-        
-        if config['output'].get('generate_testbench', False):
-            tb_file = os.path.join(config['output']['directory'], f'circuit_{i}_tb.v')
-            write_verilog_netlist(circuit, tb_file, is_testbench=True)
+    except ValueError as e:
+        logging.error(str(e))
+        return
     
-    logging.info(f"Generated {len(circuits)} circuits in {config['output']['directory']}")
+    logging.info(f"Generated {len(circuits)} circuits in {output_dir}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,7 +1,12 @@
 from typing import List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum, auto
+from functools import lru_cache
 import re
+import sys
+
+# Equations can expand to thousands of tokens and nodes; use slots where supported
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 class TokenType(Enum):
     VARIABLE = auto()
@@ -12,19 +17,52 @@ class TokenType(Enum):
     LPAREN = auto()
     RPAREN = auto()
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Token:
     type: TokenType
     value: str
     position: int
 
-@dataclass
+# Frozen since parse_boolean_equation_cached shares trees between callers
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ASTNode:
     type: TokenType
     value: Optional[str] = None
     left: Optional['ASTNode'] = None
     right: Optional['ASTNode'] = None
 
+# Single-pass tokenizer; variables start with a letter and continue with
+# letters, digits or underscores, and any other character is an error
+_TOKEN_RE = re.compile(r"""
+    (?P<VAR>[^\W\d_]\w*)
+  | (?P<AND>[&*])
+  | (?P<OR>[|+])
+  | (?P<NOT>!)
+  | (?P<XOR>\^)
+  | (?P<LPAREN>\()
+  | (?P<RPAREN>\))
+  | (?P<WS>\s+)
+  | (?P<ERR>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Token type and normalized value for each group; None keeps the matched text
+_GROUP_TOKENS = {
+    'VAR': (TokenType.VARIABLE, None),
+    'AND': (TokenType.AND, '&'),
+    'OR': (TokenType.OR, '|'),
+    'NOT': (TokenType.NOT, '!'),
+    'XOR': (TokenType.XOR, '^'),
+    'LPAREN': (TokenType.LPAREN, '('),
+    'RPAREN': (TokenType.RPAREN, ')'),
+}
+
+# Binding strength of the binary operators, loosest first
+_BINARY_PRECEDENCE = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.XOR: 3,
+}
+
 class BooleanParser:
     """Parser for boolean equations that creates an Abstract Syntax Tree."""
     
@@ -37,18 +75,25 @@ class BooleanParser:
         self.equation = equation.strip()
         self.position = 0
         self.tokens: List[Token] = []
+        self.token_index = 0
+        self._variables: Set[str] = set()
+        self._ast: Optional[ASTNode] = None
 
     def parse(self) -> ASTNode:
         """Parse the boolean equation and return its AST representation.
         
+        The tree is built on the first call and returned by later calls.
+        
         Returns:
             Root node of the Abstract Syntax Tree
             
         Raises:
             ValueError: If the equation syntax is invalid
         """
-        self._tokenize()
-        return self._parse_expression()
+        if self._ast is None:
+            self._tokenize()
+            self._ast = self._parse_expression()
+        return self._ast
 
     def get_variables(self) -> Set[str]:
         """Get all variable names used in the equation.
@@ -56,112 +101,72 @@ class BooleanParser:
         Returns:
             Set of variable names
         """
-        return {token.value for token in self.tokens if token.type == TokenType.VARIABLE}
+        return set(self._variables)
 
     def _tokenize(self) -> None:
         """Convert the equation string into a list of tokens."""
         self.tokens = []
-        self.position = 0
+        self.token_index = 0
+        self._variables = set()
         
-        while self.position < len(self.equation):
-            char = self.equation[self.position]
-            
-            if char.isspace():
-                self.position += 1
+        for match in _TOKEN_RE.finditer(self.equation):
+            kind = match.lastgroup
+            if kind == 'WS':
                 continue
-                
-            if char.isalpha():
-                self._tokenize_variable()
-            elif char == '&' or char == '*':
-                self.tokens.append(Token(TokenType.AND, '&', self.position))
-                self.position += 1
-            elif char == '|' or char == '+':
-                self.tokens.append(Token(TokenType.OR, '|', self.position))
-                self.position += 1
-            elif char == '!':
-                self.tokens.append(Token(TokenType.NOT, '!', self.position))
-                self.position += 1
-            elif char == '^':
-                self.tokens.append(Token(TokenType.XOR, '^', self.position))
-                self.position += 1
-            elif char == '(':
-                self.tokens.append(Token(TokenType.LPAREN, '(', self.position))
-                self.position += 1
-            elif char == ')':
-                self.tokens.append(Token(TokenType.RPAREN, ')', self.position))
-                self.position += 1
-            else:
-                raise ValueError(f"Invalid character '{char}' at position {self.position}")
-
-    def _tokenize_variable(self) -> None:
-        """Parse a variable name from the current position."""
-        start = self.position
-        while self.position < len(self.equation) and (
-            self.equation[self.position].isalnum() or 
-            self.equation[self.position] == '_'
-        ):
-            self.position += 1
-        
-        var_name = self.equation[start:self.position]
-        self.tokens.append(Token(TokenType.VARIABLE, var_name, start))
-
-    def _parse_expression(self, precedence: int = 0) -> ASTNode:
+            if kind == 'ERR':
+                raise ValueError(f"Invalid character '{match.group()}' at position {match.start()}")
+            
+            token_type, value = _GROUP_TOKENS[kind]
+            if value is None:
+                # Variable names become wire and port keys; intern them
+                value = sys.intern(match.group())
+                self._variables.add(value)
+            self.tokens.append(Token(token_type, value, match.start()))
+        
+        self.position = len(self.equation)
+
+    def _peek(self) -> Optional[Token]:
+        """Return the next unconsumed token, or None at the end of input."""
+        if self.token_index < len(self.tokens):
+            return self.tokens[self.token_index]
+        return None
+
+    def _advance(self) -> Token:
+        """Consume and return the next token."""
+        token = self.tokens[self.token_index]
+        self.token_index += 1
+        return token
+
+    def _parse_expression(self, min_precedence: int = 1) -> ASTNode:
         """Parse an expression with operator precedence.
         
+        Operators bind left-associatively; an operand to the right of an
+        operator only absorbs operators that bind tighter.
+        
         Args:
-            precedence: Current operator precedence level
+            min_precedence: Lowest operator precedence this call may consume
             
         Returns:
             Root node of the parsed expression
         """
-        if precedence == 0:
-            return self._parse_or()
-        elif precedence == 1:
-            return self._parse_and()
-        elif precedence == 2:
-            return self._parse_xor()
-        else:
-            return self._parse_factor()
-
-    def _parse_or(self) -> ASTNode:
-        """Parse OR expressions."""
-        left = self._parse_expression(1)
-        
-        while self.tokens and self.tokens[0].type == TokenType.OR:
-            op_token = self.tokens.pop(0)
-            right = self._parse_expression(1)
-            left = ASTNode(type=op_token.type, left=left, right=right)
-        
-        return left
-
-    def _parse_and(self) -> ASTNode:
-        """Parse AND expressions."""
-        left = self._parse_expression(2)
-        
-        while self.tokens and self.tokens[0].type == TokenType.AND:
-            op_token = self.tokens.pop(0)
-            right = self._parse_expression(2)
-            left = ASTNode(type=op_token.type, left=left, right=right)
-        
-        return left
-
-    def _parse_xor(self) -> ASTNode:
-        """Parse XOR expressions."""
         left = self._parse_factor()
         
-        while self.tokens and self.tokens[0].type == TokenType.XOR:
-            op_token = self.tokens.pop(0)
-            right = self._parse_factor()
+        while (token := self._peek()) is not None:
+            precedence = _BINARY_PRECEDENCE.get(token.type)
+            if precedence is None or precedence < min_precedence:
+                break
+            op_token = self._advance()
+            right = self._parse_expression(precedence + 1)
             left = ASTNode(type=op_token.type, left=left, right=right)
         
         return left
 
     def _parse_factor(self) -> ASTNode:
         """Parse basic factors (variables, NOT expressions, parenthesized expressions)."""
-        if not self.tokens:
+        if self._peek() is None:
             raise ValueError("Unexpected end of expression")
             
-        token = self.tokens.pop(0)
+        token = self._advance()
         
         if token.type == TokenType.VARIABLE:
             return ASTNode(type=TokenType.VARIABLE, value=token.value)
@@ -169,10 +174,11 @@ class BooleanParser:
             factor = self._parse_factor()
             return ASTNode(type=TokenType.NOT, left=factor)
         elif token.type == TokenType.LPAREN:
-            expr = self._parse_expression(0)
-            if not self.tokens or self.tokens[0].type != TokenType.RPAREN:
+            expr = self._parse_expression()
+            closing = self._peek()
+            if closing is None or closing.type != TokenType.RPAREN:
                 raise ValueError("Missing closing parenthesis")
-            self.tokens.pop(0)  # Remove RPAREN
+            self._advance()  # Remove RPAREN
             return expr
         else:
             raise ValueError(f"Unexpected token {token.value} at position {token.position}")
@@ -187,9 +193,8 @@ class BooleanParser:
             ValueError: If the equation syntax is invalid
         """
         try:
-            self._tokenize()
-            self._parse_expression()
-            if self.tokens:  # Check if there are any remaining tokens
+            self.parse()
+            if self._peek() is not None:  # Check if there are any remaining tokens
                 raise ValueError("Unexpected tokens at end of expression")
             return True
         except Exception as e:
@@ -208,4 +213,22 @@ def parse_boolean_equation(equation: str) -> ASTNode:
         ValueError: If the equation syntax is invalid
     """
     parser = BooleanParser(equation)
-    return parser.parse() 
\ No newline at end of file
+    return parser.parse() 
+
+@lru_cache(maxsize=512)
+def parse_boolean_equation_cached(equation: str) -> ASTNode:
+    """Parse a boolean equation, reusing the AST of earlier identical calls.
+    
+    The returned tree is shared between callers; AST nodes are frozen, so
+    it cannot be modified through any of them.
+    
+    Args:
+        equation: String containing the boolean equation
+        
+    Returns:
+        Root node of the shared Abstract Syntax Tree
+        
+    Raises:
+        ValueError: If the equation syntax is invalid
+    """
+    return parse_boolean_equation(equation)
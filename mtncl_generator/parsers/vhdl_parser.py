@@ -1,8 +1,26 @@
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import re
+import sys
 import logging
 
+_ENTITY_RE = re.compile(r"entity\s+(\w+)\s+is\s+Port\s*\((.*?)\)\s*;\s*end\s+\1\s*;", re.DOTALL | re.IGNORECASE)
+# Alternative entity pattern for polymorphic gates
+_ALT_ENTITY_RE = re.compile(r"entity\s+(\w+)\s+is\s*port\s*\((.*?)\)\s*;\s*end\s+entity\s+\1\s*;", re.DOTALL | re.IGNORECASE)
+_ARCH_RE = re.compile(r"architecture\s+\w+\s+of\s+(\w+)\s+is\s+begin(.*?)end\s+\w+\s*;", re.DOTALL | re.IGNORECASE)
+# Alternative architecture pattern for polymorphic gates
+_ALT_ARCH_RE = re.compile(r"architecture\s+\w+\s+of\s+(\w+)\s+is\s+begin(.*?)end\s+architecture\s+\w+\s*;", re.DOTALL | re.IGNORECASE)
+
+# Port name, direction and base type; any vector range after the type is ignored
+_PORT_RE = re.compile(r"(\w+)\s*:\s*(in|out)\s+(\w+)", re.IGNORECASE)
+
+# First delay assignment on a line, with the 'if ... then' guard preceding it
+# on the same line; polymorphic gates give their delays in ps rather than ns
+_DELAY_RE = re.compile(
+    r"^(?:.*?if\s+(?P<cond>.*?)\s+then)?.*?<=\s*'[01]'\s*after\s*(?P<time>\d+)\s*(?P<unit>ns|ps).*$",
+    re.MULTILINE
+)
+
 @dataclass
 class Port:
     name: str
@@ -69,29 +87,16 @@ class VHDLParser:
         Raises:
             ValueError: If VHDL syntax is invalid
         """
-        # Find all entity declarations and their architectures
-        # Standard entity pattern
-        entity_pattern = r"entity\s+(\w+)\s+is\s+Port\s*\((.*?)\)\s*;\s*end\s+\1\s*;"
-        # Alternative entity pattern for polymorphic gates
-        alt_entity_pattern = r"entity\s+(\w+)\s+is\s*port\s*\((.*?)\)\s*;\s*end\s+entity\s+\1\s*;"
-        
-        arch_pattern = r"architecture\s+\w+\s+of\s+(\w+)\s+is\s+begin(.*?)end\s+\w+\s*;"
-        # Alternative architecture pattern for polymorphic gates
-        alt_arch_pattern = r"architecture\s+\w+\s+of\s+(\w+)\s+is\s+begin(.*?)end\s+architecture\s+\w+\s*;"
-        
-        # Try standard pattern first
-        entity_matches = list(re.finditer(entity_pattern, content, re.DOTALL | re.IGNORECASE))
-        
-        # If no matches, try alternative pattern
+        entity_matches = list(_ENTITY_RE.finditer(content))
         if not entity_matches:
-            entity_matches = list(re.finditer(alt_entity_pattern, content, re.DOTALL | re.IGNORECASE))
+            entity_matches = list(_ALT_ENTITY_RE.finditer(content))
         
         if not entity_matches:
             raise ValueError("No valid entity declarations found")
         
         # Try both architecture patterns
-        arch_matches = list(re.finditer(arch_pattern, content, re.DOTALL | re.IGNORECASE))
-        alt_arch_matches = list(re.finditer(alt_arch_pattern, content, re.DOTALL | re.IGNORECASE))
+        arch_matches = list(_ARCH_RE.finditer(content))
+        alt_arch_matches = list(_ALT_ARCH_RE.finditer(content))
         
         # Create a map of architectures by entity name
         arch_map = {match.group(1): match.group(2) for match in arch_matches}
@@ -136,32 +141,16 @@ class VHDLParser:
         Returns:
             List of Port objects
         """
-        ports = []
-        # Standard port pattern
-        port_pattern = r"(\w+)\s*:\s*(in|out)\s+(\w+(?:_VECTOR)?(?:\s*\(\s*\d+\s+\w+\s+\d+\s*\))?)"
-        # Alternative port pattern for polymorphic gates
-        alt_port_pattern = r"(\w+)\s*:\s*(in|out)\s+(std_logic)"
-        
-        for line in ports_str.split(';'):
-            # Try standard pattern first
-            match = re.search(port_pattern, line, re.IGNORECASE)
-            if not match:
-                # Try alternative pattern
-                match = re.search(alt_port_pattern, line, re.IGNORECASE)
-            
-            if match:
-                port_type = match.group(3).strip().upper()
-                # Extract base type without range for vector types
-                if '(' in port_type:
-                    port_type = port_type.split('(')[0].strip()
-                port = Port(
-                    name=match.group(1),
-                    direction=match.group(2).lower(),
-                    port_type=port_type
-                )
-                ports.append(port)
-        
-        return ports
+        # Port names, directions and types repeat across every gate; intern
+        # them so all gates share one copy of each string
+        return [
+            Port(
+                name=sys.intern(match.group(1)),
+                direction=sys.intern(match.group(2).lower()),
+                port_type=sys.intern(match.group(3).upper())
+            )
+            for match in _PORT_RE.finditer(ports_str)
+        ]
 
     def _parse_delays(self, arch_str: str) -> List[Delay]:
         """Parse timing delays from architecture body.
@@ -173,34 +162,12 @@ class VHDLParser:
             List of Delay objects
         """
         delays = []
-        # Standard delay pattern
-        delay_pattern = r"<=\s*'[01]'\s*after\s*(\d+)\s*ns"
-        # Alternative delay pattern for polymorphic gates (using ps)
-        alt_delay_pattern = r"<=\s*'[01]'\s*after\s*(\d+)\s*ps"
-        condition_pattern = r"if\s+(.*?)\s+then"
-        
-        # Find all delay assignments
-        for line in arch_str.split('\n'):
-            # Try standard pattern first
-            delay_match = re.search(delay_pattern, line)
-            if not delay_match:
-                # Try alternative pattern
-                delay_match = re.search(alt_delay_pattern, line)
-                if delay_match:
-                    # Convert ps to ns
-                    time = float(delay_match.group(1)) / 1000
-                else:
-                    continue
-            else:
-                time = float(delay_match.group(1))
-            
-            # Try to find associated condition
-            condition = "default"
-            cond_match = re.search(condition_pattern, line)
-            if cond_match:
-                condition = cond_match.group(1).strip()
-            
-            delays.append(Delay(condition=condition, time=time))
+        for match in _DELAY_RE.finditer(arch_str):
+            time = float(match.group('time'))
+            if match.group('unit') == 'ps':
+                time /= 1000
+            condition = match.group('cond')
+            delays.append(Delay(condition=condition.strip() if condition is not None else "default", time=time))
         
         return delays
 
@@ -1,6 +1,16 @@
-from typing import List, Dict, Set, Union, Any
+import io
+import os
+from functools import cached_property
+from itertools import chain
+from typing import List, Dict, Set, TextIO, Tuple, Union, Any
 from ..core.circuit_generator import Circuit, GateInstance, Wire
 
+# Global control signals, declared separately from the circuit inputs
+_CTRL = frozenset(("sleep", "rst"))
+
+# Netlists are written in many small pieces; buffer them into few large writes
+_WRITE_BUFFER_SIZE = 1 << 20
+
 class VerilogWriter:
     """Writer for generating Verilog netlists from circuit descriptions."""
     
@@ -22,17 +32,41 @@ class VerilogWriter:
             self.outputs = set(circuit.get('outputs', []))
             self.gates = circuit.get('gates', [])
             # Collect all wires from gate connections
-            self.wires = set()
-            for gate in self.gates:
-                for wire in gate.get('inputs', {}).values():
-                    self.wires.add(wire)
-                for wire in gate.get('outputs', {}).values():
-                    self.wires.add(wire)
+            self.wires = set(chain.from_iterable(
+                chain(gate.get('inputs', {}).values(), gate.get('outputs', {}).values())
+                for gate in self.gates
+            ))
         else:
             self.inputs = circuit.inputs
             self.outputs = circuit.outputs
             self.gates = circuit.gates
             self.wires = circuit.wires
+        
+        self._sorted_inputs = sorted(p for p in self.inputs if p not in _CTRL)
+        self._sorted_outputs = sorted(self.outputs)
+        self._gate_templates: Dict[Tuple, Tuple[str, List[str], List[str]]] = {}
+    
+    @cached_property
+    def _sorted_internal_wires(self) -> List[str]:
+        """Sorted wires that are neither circuit inputs nor outputs.
+        
+        Only netlists declare internal wires, so this is computed on first use.
+        """
+        return sorted(set(self.wires).difference(self.inputs, self.outputs))
+    
+    @cached_property
+    def _monitor_block(self) -> str:
+        """Testbench $monitor statement over the control signals and all ports."""
+        monitored_ports = [*self._sorted_inputs, *self._sorted_outputs]
+        # The format string is a single Verilog string literal, so it must
+        # stay on one line
+        fmt = " ".join([f"{port}=%b" for port in ["sleep", "rst", *monitored_ports]])
+        signals = ", ".join(["sleep", "rst", *monitored_ports])
+        return (
+            f'        $monitor($time, " {fmt}",\n'
+            f'            {signals}\n'
+            '        );\n'
+        )
     
     def generate_netlist(self) -> str:
         """Generate a complete Verilog netlist for the circuit.
@@ -40,167 +74,148 @@ class VerilogWriter:
         Returns:
             String containing the Verilog netlist
         """
-        verilog_lines = []
-        
-        # Add module header
-        verilog_lines.extend(self._generate_module_header())
-        
-        # Add wire declarations
-        verilog_lines.extend(self._generate_wire_declarations())
-        
-        # Add gate instantiations
-        verilog_lines.extend(self._generate_gate_instantiations())
+        buf = io.StringIO()
+        self.write_netlist(buf)
+        return buf.getvalue()
+    
+    def write_netlist(self, fp: TextIO) -> None:
+        """Write the Verilog netlist for the circuit to a text stream.
         
-        # Add module footer
-        verilog_lines.append("endmodule")
+        Args:
+            fp: Writable text stream, e.g. an open file
+        """
+        self._generate_module_header(fp)
+        self._generate_wire_declarations(fp)
+        self._generate_gate_instantiations(fp)
         
-        return "\n".join(verilog_lines)
+        # Module footer
+        fp.write("endmodule")
     
-    def _generate_module_header(self) -> List[str]:
+    def _generate_module_header(self, buf: TextIO) -> None:
         """Generate the Verilog module header.
         
-        Returns:
-            List of lines for the module header
+        Args:
+            buf: Text buffer the header lines are written to
         """
-        lines = []
-        
         # Add timescale directive for MTNCL timing
-        lines.append("`timescale 1ns/1ps")
-        lines.append("")
+        buf.write("`timescale 1ns/1ps\n\n")
         
         # Module declaration
-        lines.append(f"module {self.module_name} (")
+        buf.write(f"module {self.module_name} (\n")
         
         # Global control signals first
-        lines.append("    // Control signals")
-        lines.append("    input wire sleep,")
-        lines.append("    input wire rst,")
-        lines.append("")
+        buf.write("    // Control signals\n"
+                  "    input wire sleep,\n"
+                  "    input wire rst,\n"
+                  "\n")
         
         # Input ports
-        input_ports = sorted(p for p in self.inputs if p not in {"sleep", "rst"})
+        input_ports = self._sorted_inputs
         if input_ports:
-            lines.append("    // Input ports")
-            for port in input_ports:
-                lines.append(f"    input wire {port},")
-            lines.append("")
+            buf.write("    // Input ports\n")
+            buf.writelines([f"    input wire {port},\n" for port in input_ports])
+            buf.write("\n")
         
         # Output ports
-        output_ports = sorted(self.outputs)
-        lines.append("    // Output ports")
-        for port in output_ports[:-1]:
-            lines.append(f"    output wire {port},")
-        lines.append(f"    output wire {output_ports[-1]}")
+        output_ports = self._sorted_outputs
+        buf.write("    // Output ports\n")
+        buf.writelines([f"    output wire {port},\n" for port in output_ports[:-1]])
+        buf.write(f"    output wire {output_ports[-1]}\n")
         
-        lines.append(");")
-        lines.append("")
-        
-        return lines
+        buf.write(");\n\n")
     
-    def _generate_wire_declarations(self) -> List[str]:
+    def _generate_wire_declarations(self, buf: TextIO) -> None:
         """Generate wire declarations for internal connections.
         
-        Returns:
-            List of lines declaring internal wires
+        Args:
+            buf: Text buffer the wire declarations are written to
         """
-        lines = []
-        internal_wires = set()
-        
-        # Find all internal wires (not inputs or outputs)
-        for wire_name in self.wires:
-            if (wire_name not in self.inputs and 
-                wire_name not in self.outputs):
-                internal_wires.add(wire_name)
-        
+        internal_wires = self._sorted_internal_wires
         if internal_wires:
-            lines.append("    // Internal wires")
-            for wire in sorted(internal_wires):
-                lines.append(f"    wire {wire};")
-            lines.append("")
-        
-        return lines
+            buf.write("    // Internal wires\n")
+            buf.writelines([f"    wire {wire};\n" for wire in internal_wires])
+            buf.write("\n")
     
-    def _generate_gate_instantiations(self) -> List[str]:
+    def _generate_gate_instantiations(self, buf: TextIO) -> None:
         """Generate gate instantiations for all gates in the circuit.
         
-        Returns:
-            List of lines instantiating gates
+        Args:
+            buf: Text buffer the gate instantiations are written to
         """
-        lines = []
-        lines.append("    // Gate instantiations")
+        buf.write("    // Gate instantiations\n")
         
         for i, gate in enumerate(self.gates):
             if self._is_dict:
                 # Dictionary format
                 gate_type = gate.get('type', '').upper()
-                instance_name = f"{gate_type.lower()}_inst_{i}"
                 inputs = gate.get('inputs', {})
                 outputs = gate.get('outputs', {})
                 
-                lines.append(f"    {gate_type} {instance_name} (")
-                
-                # Connect inputs
-                input_connections = []
-                for port_name, wire_name in sorted(inputs.items()):
-                    input_connections.append(f".{port_name}({wire_name})")
-                
-                # Connect outputs
-                output_connections = []
-                for port_name, wire_name in sorted(outputs.items()):
-                    output_connections.append(f".{port_name}({wire_name})")
-                
-                # Add sleep and reset connections
-                input_connections.append(".S(sleep)")
-                input_connections.append(".vdd_sel(1'b1)")  # Default to high voltage mode
-                
-                # Combine all connections
-                all_connections = input_connections + output_connections
-                for conn in all_connections[:-1]:
-                    lines.append(f"        {conn},")
-                lines.append(f"        {all_connections[-1]}")
-                
-                lines.append("    );")
-                lines.append("")
+                # Add sleep and reset connections; default to high voltage mode
+                template, input_ports, output_ports = self._gate_template(
+                    gate_type, inputs, outputs, (".S(sleep)", ".vdd_sel(1'b1)")
+                )
+                buf.write(template.format(
+                    f"{gate_type.lower()}_inst_{i}",
+                    *[inputs[port] for port in input_ports],
+                    *[outputs[port] for port in output_ports]
+                ))
             else:
                 # Circuit object format
-                lines.extend(self._generate_single_gate(gate))
-        
-        return lines
+                self._generate_single_gate(gate, buf)
     
-    def _generate_single_gate(self, gate: GateInstance) -> List[str]:
+    def _generate_single_gate(self, gate: GateInstance, buf: TextIO) -> None:
         """Generate Verilog code for a single gate instance.
         
         Args:
             gate: Gate instance to generate code for
-            
-        Returns:
-            List of lines for the gate instantiation
+            buf: Text buffer the gate instantiation is written to
         """
-        lines = []
-        
-        # Gate instantiation
-        lines.append(f"    {gate.gate_type} {gate.instance_name} (")
-        
-        # Connect inputs
-        input_connections = []
-        for port_name, wire_name in sorted(gate.inputs.items()):
-            input_connections.append(f".{port_name}({wire_name})")
-        
-        # Connect outputs
-        output_connections = []
-        for port_name, wire_name in sorted(gate.outputs.items()):
-            output_connections.append(f".{port_name}({wire_name})")
-        
-        # Combine all connections
-        all_connections = input_connections + output_connections
-        for conn in all_connections[:-1]:
-            lines.append(f"        {conn},")
-        lines.append(f"        {all_connections[-1]}")
+        template, input_ports, output_ports = self._gate_template(
+            gate.gate_type, gate.inputs, gate.outputs
+        )
+        buf.write(template.format(
+            gate.instance_name,
+            *[gate.inputs[port] for port in input_ports],
+            *[gate.outputs[port] for port in output_ports]
+        ))
+    
+    def _gate_template(self, gate_type: str, inputs: Dict[str, str], outputs: Dict[str, str],
+                       extra_connections: Tuple[str, ...] = ()) -> Tuple[str, List[str], List[str]]:
+        """Get the instantiation template for a gate type and port layout.
         
-        lines.append("    );")
-        lines.append("")
+        Gates of the same type share their port names, so the port sort and
+        the connection text are built once and reused for every instance.
         
-        return lines
+        Args:
+            gate_type: Verilog module name of the gate
+            inputs: Mapping of input port names to wire names
+            outputs: Mapping of output port names to wire names
+            extra_connections: Fixed connections placed after the inputs
+            
+        Returns:
+            Tuple of (format template taking the instance name followed by
+            the wires, sorted input port names, sorted output port names)
+        """
+        key = (gate_type, tuple(inputs), tuple(outputs), extra_connections)
+        entry = self._gate_templates.get(key)
+        if entry is None:
+            input_ports = sorted(inputs)
+            output_ports = sorted(outputs)
+            
+            # Connect inputs, fixed connections, then outputs
+            connections = [f".{port}({{}})" for port in input_ports]
+            connections.extend(extra_connections)
+            connections.extend(f".{port}({{}})" for port in output_ports)
+            
+            template = (
+                f"    {gate_type} {{}} (\n"
+                + ",\n".join(f"        {conn}" for conn in connections)
+                + "\n    );\n\n"
+            )
+            entry = (template, input_ports, output_ports)
+            self._gate_templates[key] = entry
+        return entry
     
     def generate_testbench(self) -> str:
         """Generate a basic testbench for the circuit.
@@ -208,115 +223,91 @@ class VerilogWriter:
         Returns:
             String containing the Verilog testbench
         """
-        lines = []
+        buf = io.StringIO()
+        self.write_testbench(buf)
+        return buf.getvalue()
+    
+    def write_testbench(self, fp: TextIO) -> None:
+        """Write a basic testbench for the circuit to a text stream.
         
+        Args:
+            fp: Writable text stream, e.g. an open file
+        """
         # Testbench module
-        lines.append("`timescale 1ns/1ps")
-        lines.append(f"module {self.testbench_name} (");
+        fp.write("`timescale 1ns/1ps\n")
+        fp.write(f"module {self.testbench_name} (\n")
         
         # Declare registers and wires
-        lines.append("    // Control signals")
-        lines.append("    reg sleep;")
-        lines.append("    reg rst;")
-        lines.append("")
+        fp.write("    // Control signals\n"
+                 "    reg sleep;\n"
+                 "    reg rst;\n"
+                 "\n")
         
-        input_ports = sorted(p for p in self.inputs if p not in {"sleep", "rst"})
+        input_ports = self._sorted_inputs
         if input_ports:
-            lines.append("    // Input signals")
-            for input_port in input_ports:
-                lines.append(f"    reg {input_port};")
-            lines.append("")
+            fp.write("    // Input signals\n")
+            fp.writelines([f"    reg {input_port};\n" for input_port in input_ports])
+            fp.write("\n")
         
-        lines.append("    // Output signals")
-        for output_port in sorted(self.outputs):
-            lines.append(f"    wire {output_port};")
-        lines.append("")
+        fp.write("    // Output signals\n")
+        fp.writelines([f"    wire {output_port};\n" for output_port in self._sorted_outputs])
+        fp.write("\n")
         
         # Instantiate circuit under test
-        lines.append(f"    // Instantiate the Unit Under Test (UUT)")
-        lines.append(f"    {self.module_name} uut (")
-        
-        # Connect ports
-        connections = []
-        connections.append("        .sleep(sleep)")
-        connections.append("        .rst(rst)")
-        for port in input_ports:
-            connections.append(f"        .{port}({port})")
-        for port in sorted(self.outputs):
-            connections.append(f"        .{port}({port})")
-        
-        lines.append(",\n".join(connections))
-        lines.append("    );")
-        lines.append("")
+        connections = [".sleep(sleep)", ".rst(rst)",
+                       *[f".{port}({port})" for port in input_ports],
+                       *[f".{port}({port})" for port in self._sorted_outputs]]
+        fp.write("    // Instantiate the Unit Under Test (UUT)\n"
+                 f"    {self.module_name} uut (\n"
+                 "        " + ",\n        ".join(connections) + "\n"
+                 "    );\n\n")
         
         # Add initial block with test vectors
-        lines.append("    initial begin")
-        lines.append("        // Initialize control signals")
-        lines.append("        sleep = 1;")
-        lines.append("        rst = 1;")
-        lines.append("")
+        fp.write("    initial begin\n"
+                 "        // Initialize control signals\n"
+                 "        sleep = 1;\n"
+                 "        rst = 1;\n"
+                 "\n")
         
         if input_ports:
-            lines.append("        // Initialize inputs")
-            for input_port in input_ports:
-                lines.append(f"        {input_port} = 0;")
-            lines.append("")
-        
-        lines.append("        // Wait 100ns for global reset")
-        lines.append("        #100;")
-        lines.append("        rst = 0;")
-        lines.append("        sleep = 0;")
-        lines.append("")
-        
-        lines.append("        // Add test vectors")
-        if input_ports:
-            lines.append("        #50;")
-            for input_port in input_ports:
-                lines.append(f"        {input_port} = 1;")
-            lines.append("        #50;")
-            for input_port in input_ports:
-                lines.append(f"        {input_port} = 0;")
-        
-        lines.append("        // Test sleep mode")
-        lines.append("        #50;")
-        lines.append("        sleep = 1;")
-        lines.append("        #50;")
-        lines.append("        sleep = 0;")
-        lines.append("")
-        
-        lines.append("        // End simulation")
-        lines.append("        #100;")
-        lines.append("        $finish;")
-        lines.append("    end")
-        lines.append("")
+            fp.write("        // Initialize inputs\n")
+            fp.writelines([f"        {input_port} = 0;\n" for input_port in input_ports])
+            fp.write("\n")
         
-        # Add monitoring
-        lines.append("    // Monitor changes")
-        lines.append("    initial begin")
-        lines.append("        $monitor($time, \" sleep=%b rst=%b ")
+        fp.write("        // Wait 100ns for global reset\n"
+                 "        #100;\n"
+                 "        rst = 0;\n"
+                 "        sleep = 0;\n"
+                 "\n")
         
-        # Create monitor format string
-        monitor_ports = []
-        for port in input_ports:
-            monitor_ports.append(f"{port}=%b")
-        for port in sorted(self.outputs):
-            monitor_ports.append(f"{port}=%b")
-        
-        lines.append(" ".join(monitor_ports) + "\",")
-        
-        # Add monitored signals
-        monitor_signals = ["sleep", "rst"]
-        monitor_signals.extend(input_ports)
-        monitor_signals.extend(sorted(self.outputs))
-        
-        lines.append("            " + ", ".join(monitor_signals))
-        lines.append("        );")
-        lines.append("    end")
-        lines.append("")
+        fp.write("        // Add test vectors\n")
+        if input_ports:
+            fp.write("        #50;\n")
+            fp.writelines([f"        {input_port} = 1;\n" for input_port in input_ports])
+            fp.write("        #50;\n")
+            fp.writelines([f"        {input_port} = 0;\n" for input_port in input_ports])
+        
+        fp.write("        // Test sleep mode\n"
+                 "        #50;\n"
+                 "        sleep = 1;\n"
+                 "        #50;\n"
+                 "        sleep = 0;\n"
+                 "\n")
+        
+        fp.write("        // End simulation\n"
+                 "        #100;\n"
+                 "        $finish;\n"
+                 "    end\n"
+                 "\n")
         
-        lines.append("endmodule")
+        # Add monitoring
+        fp.write("    // Monitor changes\n"
+                 "    initial begin\n")
+        fp.write(self._monitor_block)
+        fp.write("    end\n"
+                 "\n")
         
-        return "\n".join(lines)
+        fp.write("endmodule")
 
 def write_verilog_netlist(circuit: Dict, output_file: str, is_testbench: bool = False) -> None:
     """Write a Verilog netlist to a file.
@@ -330,9 +321,15 @@ def write_verilog_netlist(circuit: Dict, output_file: str, is_testbench: bool =
         ValueError: If the circuit dictionary is invalid
     """
     writer = VerilogWriter(circuit)
+    write = writer.write_testbench if is_testbench else writer.write_netlist
     
-    with open(output_file, 'w') as f:
-        if is_testbench:
-            f.write(writer.generate_testbench())
-        else:
-            f.write(writer.generate_netlist()) 
\ No newline at end of file
+    # Stream into a temporary file so a failure leaves any existing file intact
+    tmp_path = f'{output_file}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', buffering=_WRITE_BUFFER_SIZE) as f:
+            write(f)
+        os.replace(tmp_path, output_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise 
\ No newline at end of file
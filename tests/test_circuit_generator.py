@@ -1,7 +1,7 @@
 import pytest
 from mtncl_generator.parsers.boolean_parser import BooleanParser
 from mtncl_generator.parsers.vhdl_parser import VHDLParser, GateInfo, Port
-from mtncl_generator.core.circuit_generator import CircuitGenerator, Circuit
+from mtncl_generator.core.circuit_generator import CircuitGenerator, Circuit, GateInstance, Wire
 
 @pytest.fixture
 def basic_gates():
@@ -372,4 +372,163 @@ def test_optimization_target(basic_gates, basic_config):
     circuit = circuits[0]
     
     # Should prefer balanced tree structure for minimum delay
-    assert circuit.depth <= 2  # log2(4) rounded up 
\ No newline at end of file
+    assert circuit.depth <= 2  # log2(4) rounded up 
+
+def test_equivalent_circuits_ignore_gate_order(basic_gates, basic_config):
+    """Test that structural equivalence ignores gate order and instance names."""
+    parser = BooleanParser("(A + B) & (C + D)")
+    ast = parser.parse()
+    
+    generator = CircuitGenerator(basic_gates, ast, basic_config)
+    circuit1 = generator._generate_single_circuit()
+    circuit2 = generator._generate_single_circuit()
+    circuit2.gates.reverse()
+    for gate in circuit2.gates:
+        gate.instance_name = gate.instance_name + "_copy"
+    
+    assert generator._are_circuits_equivalent(circuit1, circuit2)
+    assert generator._canonical_signature(circuit1) == generator._canonical_signature(circuit2)
+    
+    circuit2.gates[0].gate_type = "TH22m"
+    assert not generator._are_circuits_equivalent(circuit1, circuit2)
+
+def test_circuit_depth_unbalanced(basic_gates, basic_config):
+    """Test that depth follows the longest path through an unbalanced tree."""
+    parser = BooleanParser("((A ^ B) & C) ^ D")
+    ast = parser.parse()
+    
+    generator = CircuitGenerator(basic_gates, ast, basic_config)
+    circuits = generator.generate_circuits(1)
+    
+    assert len(circuits) == 1
+    assert circuits[0].depth == 3
+
+def test_alternative_and_circuit(basic_gates, basic_config):
+    """Test alternative AND implementations fall back through the variant table."""
+    del basic_gates["TH22m"]
+    
+    parser = BooleanParser("A & B")
+    ast = parser.parse()
+    
+    generator = CircuitGenerator(basic_gates, ast, basic_config)
+    circuits = generator.generate_circuits(2)
+    
+    assert len(circuits) == 2
+    alt_gate = circuits[1].gates[0]
+    assert alt_gate.gate_type == "TH33"
+    assert alt_gate.inputs == {"A": "A", "B": "A", "C": "B"}
+
+def test_alternative_circuits_are_independent(basic_gates, basic_config):
+    """Test that repeated alternative generation does not share mutable state."""
+    parser = BooleanParser("(A + B) & (C + D)")
+    ast = parser.parse()
+    
+    generator = CircuitGenerator(basic_gates, ast, basic_config)
+    circuit1 = generator._generate_alternative_circuit()
+    circuit2 = generator._generate_alternative_circuit()
+    
+    assert circuit1 is not circuit2
+    assert circuit1.gates[-1].gate_type == "TH22m"
+    assert generator._are_circuits_equivalent(circuit1, circuit2)
+    for name, wire in circuit2.wires.items():
+        assert wire is not circuit1.wires[name]
+        assert len(wire.destinations) <= 1
+
+def test_modifying_result_leaves_later_generations_intact(basic_gates, basic_config):
+    """Test that editing a returned circuit does not leak into later results."""
+    ast = BooleanParser("(A + B) & (C + D)").parse()
+    expected = CircuitGenerator(basic_gates, ast, basic_config).generate_circuits(2)
+    
+    generator = CircuitGenerator(basic_gates, ast, basic_config)
+    circuits = generator.generate_circuits(2)
+    assert len(circuits) == 2
+    for circuit in circuits:
+        for gate in circuit.gates:
+            gate.inputs["A"] = "renamed"
+            gate.outputs["Z"] = "renamed"
+    
+    assert generator.generate_circuits(2) == expected
+
+def test_depth_of_hand_built_circuit(basic_gates, basic_config):
+    """Test depth calculation for gates without cached input drivers."""
+    parser = BooleanParser("A + B")
+    generator = CircuitGenerator(basic_gates, parser.parse(), basic_config)
+    
+    circuit = Circuit(
+        inputs={"A", "B", "C"},
+        outputs={"Z"},
+        gates=[
+            GateInstance(gate_type="TH12", instance_name="g0",
+                         inputs={"A": "A", "B": "B"}, outputs={"Z": "w0"}),
+            GateInstance(gate_type="TH22", instance_name="g1",
+                         inputs={"A": "w0", "B": "C"}, outputs={"Z": "Z"})
+        ],
+        wires={
+            "A": Wire(name="A"),
+            "B": Wire(name="B"),
+            "C": Wire(name="C"),
+            "w0": Wire(name="w0", source="g0"),
+            "Z": Wire(name="Z", source="g1")
+        },
+        depth=0,
+        gate_count=2
+    )
+    
+    assert generator._calculate_depth(circuit) == 2
+
+def test_depth_of_out_of_order_circuit(basic_gates, basic_config):
+    """Test that depth does not depend on the order of hand-built gates."""
+    parser = BooleanParser("A + B")
+    generator = CircuitGenerator(basic_gates, parser.parse(), basic_config)
+    
+    circuit = Circuit(
+        inputs={"A", "B", "C", "D"},
+        outputs={"Z"},
+        gates=[
+            GateInstance(gate_type="TH22", instance_name="g2",
+                         inputs={"A": "w1", "B": "D"}, outputs={"Z": "Z"}),
+            GateInstance(gate_type="TH22", instance_name="g1",
+                         inputs={"A": "w0", "B": "C"}, outputs={"Z": "w1"}),
+            GateInstance(gate_type="TH12", instance_name="g0",
+                         inputs={"A": "A", "B": "B"}, outputs={"Z": "w0"})
+        ],
+        wires={
+            "A": Wire(name="A"),
+            "B": Wire(name="B"),
+            "C": Wire(name="C"),
+            "D": Wire(name="D"),
+            "w0": Wire(name="w0", source="g0"),
+            "w1": Wire(name="w1", source="g1"),
+            "Z": Wire(name="Z", source="g2")
+        },
+        depth=0,
+        gate_count=3
+    )
+    
+    assert generator._calculate_depth(circuit) == 3
+
+def test_depth_of_cyclic_circuit(basic_gates, basic_config):
+    """Test that a feedback loop between gates is reported as depth -1."""
+    parser = BooleanParser("A + B")
+    generator = CircuitGenerator(basic_gates, parser.parse(), basic_config)
+    
+    circuit = Circuit(
+        inputs={"A", "B"},
+        outputs={"w1"},
+        gates=[
+            GateInstance(gate_type="TH12", instance_name="g0",
+                         inputs={"A": "A", "B": "w1"}, outputs={"Z": "w0"}),
+            GateInstance(gate_type="TH22", instance_name="g1",
+                         inputs={"A": "w0", "B": "B"}, outputs={"Z": "w1"})
+        ],
+        wires={
+            "A": Wire(name="A"),
+            "B": Wire(name="B"),
+            "w0": Wire(name="w0", source="g0"),
+            "w1": Wire(name="w1", source="g1")
+        },
+        depth=0,
+        gate_count=2
+    )
+    
+    assert generator._calculate_depth(circuit) == -1
@@ -0,0 +1,82 @@
+import os
+import pytest
+from mtncl_generator import main
+from mtncl_generator.main import _load_gates_cached, generate_mtncl_circuits
+
+VHDL_CONTENT = """
+entity TH12 is
+    Port ( A : in  STD_LOGIC;
+           B : in  STD_LOGIC;
+           Z : out STD_LOGIC);
+end TH12;
+"""
+
+def test_gate_cache_reused_until_file_changes(tmp_path, monkeypatch):
+    """Test that cached gate libraries are reused and refreshed on change."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    gate_file = tmp_path / 'gates.vhdl'
+    gate_file.write_text(VHDL_CONTENT)
+    
+    gates = _load_gates_cached([str(gate_file)])
+    assert list(gates) == ['TH12']
+    assert len(os.listdir(tmp_path / 'cache' / 'mtncl')) == 1
+    assert _load_gates_cached([str(gate_file)]) == gates
+    
+    gate_file.write_text(VHDL_CONTENT.replace('TH12', 'TH22'))
+    os.utime(gate_file, ns=(0, 0))
+    assert list(_load_gates_cached([str(gate_file)])) == ['TH22']
+
+def test_gate_cache_ignores_unloadable_and_stale_entries(tmp_path, monkeypatch):
+    """Test that broken or other-schema cache entries fall back to parsing."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    cache_dir = tmp_path / 'cache' / 'mtncl'
+    gate_file = tmp_path / 'gates.vhdl'
+    gate_file.write_text(VHDL_CONTENT)
+    
+    gates = _load_gates_cached([str(gate_file)])
+    (cache_file,) = cache_dir.iterdir()
+    
+    # A pickle referring to a module that no longer exists
+    cache_file.write_bytes(b"cno_such_module\nGateInfo\n.")
+    assert _load_gates_cached([str(gate_file)]) == gates
+    
+    monkeypatch.setattr(main, '_CACHE_SCHEMA', main._CACHE_SCHEMA + 1)
+    assert _load_gates_cached([str(gate_file)]) == gates
+    assert len(os.listdir(cache_dir)) == 2
+
+def test_gate_cache_missing_file(tmp_path, monkeypatch):
+    """Test that missing gate files are still reported."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    with pytest.raises(FileNotFoundError):
+        _load_gates_cached([str(tmp_path / 'missing.vhdl')])
+
+def test_missing_equation_skips_file_work(tmp_path):
+    """Test that missing equations are reported before gates are parsed."""
+    output_dir = tmp_path / 'out'
+    with pytest.raises(ValueError):
+        generate_mtncl_circuits(
+            hvdd_equation="A + B",
+            gate_files=[str(tmp_path / 'missing.vhdl')],
+            output_dir=str(output_dir),
+            is_polymorphic=True
+        )
+    assert not output_dir.exists()
+
+def test_generate_regular_circuits(tmp_path, monkeypatch):
+    """Test regular generation through the library entry point."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    gates_file = os.path.join(os.path.dirname(__file__), '..', 'gates', 'basic_gates.vhdl')
+    output_dir = tmp_path / 'out'
+    
+    circuits = generate_mtncl_circuits(
+        equation="(A + B) & (C + D)",
+        gate_files=[gates_file],
+        output_dir=str(output_dir),
+        num_circuits=2,
+        generate_testbench=True
+    )
+    
+    assert len(circuits) == 2
+    assert sorted(os.listdir(output_dir)) == [
+        'README.md', 'circuit_0.v', 'circuit_0_tb.v', 'circuit_1.v', 'circuit_1_tb.v'
+    ]
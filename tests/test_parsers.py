@@ -1,5 +1,8 @@
 import pytest
-from mtncl_generator.parsers.boolean_parser import BooleanParser, TokenType, ASTNode
+from dataclasses import FrozenInstanceError
+from mtncl_generator.parsers.boolean_parser import (
+    BooleanParser, TokenType, ASTNode, parse_boolean_equation, parse_boolean_equation_cached
+)
 from mtncl_generator.parsers.vhdl_parser import VHDLParser, GateInfo, Port
 
 def test_boolean_parser_simple():
@@ -39,6 +42,40 @@ def test_boolean_parser_variables():
     variables = parser.get_variables()
     assert variables == {"A", "B", "C", "D"}
 
+def test_boolean_parser_long_chain():
+    """Test that long operator chains parse without consuming the token list."""
+    names = [f"X{i}" for i in range(2000)]
+    parser = BooleanParser(" + ".join(names))
+    ast = parser.parse()
+    
+    assert ast.type == TokenType.OR
+    assert ast.right.value == "X1999"
+    assert parser.get_variables() == set(names)
+
+def test_boolean_parser_validate_then_parse():
+    """Test that parsing after validation reuses the validated tree."""
+    parser = BooleanParser("(A + B) & C")
+    assert parser.validate()
+    tokens = parser.tokens
+    
+    ast = parser.parse()
+    assert parser.tokens is tokens
+    assert parser.parse() is ast
+    assert ast.type == TokenType.AND
+
+def test_cached_parse_is_shared():
+    """Test that cached parses are reused while plain parses stay private."""
+    ast = parse_boolean_equation_cached("A & B")
+    assert parse_boolean_equation_cached("A & B") is ast
+    assert parse_boolean_equation("A & B") is not ast
+    assert parse_boolean_equation("A & B") == ast
+    
+    with pytest.raises(FrozenInstanceError):
+        ast.left = ast.right
+    
+    with pytest.raises(ValueError):
+        parse_boolean_equation_cached("A + + B")
+
 def test_vhdl_parser_basic():
     """Test parsing of basic VHDL gate definitions."""
     vhdl_content = """
@@ -62,6 +99,21 @@ def test_vhdl_parser_basic():
     import os
     os.remove("test_gate.vhdl")
 
+def test_vhdl_parser_delays():
+    """Test extraction of ns and ps delays with their guarding conditions."""
+    arch_str = """
+        if A = '1' then Z <= '1' after 5 ns;
+        elsif S = '1' then Z <= '0' after 250 ps;
+        Z <= '0' after 2 ns;
+        Z <= A;
+    """
+    
+    delays = VHDLParser([])._parse_delays(arch_str)
+    
+    assert [(d.condition, d.time) for d in delays] == [
+        ("A = '1'", 5.0), ("S = '1'", 0.25), ("default", 2.0)
+    ]
+
 def test_vhdl_parser_multiple_gates():
     """Test parsing of multiple gates from a single file."""
     vhdl_content = """
@@ -1,5 +1,6 @@
+import copy
 import pytest
-from mtncl_generator.core.polymorphic_generator import PolymorphicCircuitGenerator
+from mtncl_generator.core.polymorphic_generator import PolymorphicCircuitGenerator, generate_polymorphic_batch
 from mtncl_generator.parsers.vhdl_parser import GateInfo, Port
 from mtncl_generator.core.circuit_generator import Circuit, GateInstance, Wire
 
@@ -73,6 +74,24 @@ def polymorphic_gates():
     }
     return gates
 
+def single_gate_circuit(gate_type, inputs=None):
+    """Build a one-gate circuit over inputs A and B driving wire w0."""
+    return Circuit(
+        inputs={"A", "B"},
+        outputs={"w0"},
+        gates=[
+            GateInstance(
+                gate_type=gate_type,
+                instance_name=f"{gate_type.lower()}0",
+                inputs=inputs if inputs is not None else {"A": "A", "B": "B"},
+                outputs={"Z": "w0"}
+            )
+        ],
+        wires={},
+        depth=1,
+        gate_count=1
+    )
+
 def test_simple_polymorphic_circuit(polymorphic_gates):
     """Test generation of a simple polymorphic circuit (OR/AND)."""
     generator = PolymorphicCircuitGenerator(
@@ -447,4 +466,78 @@ def test_optimization_constraints(polymorphic_gates):
     # Test with relaxed constraints
     generator.config['gate_constraints']['max_depth'] = 2
     circuits = generator.generate_circuits()
-    assert len(circuits) > 0  # Should find valid implementations 
\ No newline at end of file
+    assert len(circuits) > 0  # Should find valid implementations 
+
+def test_find_compatible_circuits_requires_same_wiring(polymorphic_gates):
+    """Test that only circuits with identical wiring are paired."""
+    generator = PolymorphicCircuitGenerator(
+        polymorphic_gates,
+        hvdd_equation="A + B",
+        lvdd_equation="A & B"
+    )
+    
+    hvdd_circuit = single_gate_circuit("TH12", {"A": "A", "B": "B"})
+    lvdd_same = single_gate_circuit("TH22", {"A": "A", "B": "B"})
+    lvdd_swapped = single_gate_circuit("TH22", {"A": "B", "B": "A"})
+    
+    results = generator._find_compatible_circuits([hvdd_circuit], [lvdd_same], use_direct=True)
+    assert len(results) == 1
+    assert results[0]['gates'][0]['type'] == 'th12m_th22m'
+    
+    results = generator._find_compatible_circuits([hvdd_circuit], [lvdd_swapped], use_direct=True)
+    assert results == []
+
+def test_alternative_circuits_pair_regardless_of_operand_order(polymorphic_gates):
+    """Test that TH13/TH33 variants pair even when the equations order operands differently."""
+    generator = PolymorphicCircuitGenerator(polymorphic_gates, "B + A", "A & B", {})
+    circuits = generator.generate_circuits(3)
+
+    assert len(circuits) == 2
+    assert [c['gates'][0]['type'] for c in circuits] == ['th12m_th22m', 'th13m_th33m']
+
+def test_alternative_implementation_duplicates_input(polymorphic_gates):
+    """Test that two-input gates map onto TH13m_TH33m with a tied third input."""
+    generator = PolymorphicCircuitGenerator(
+        polymorphic_gates,
+        hvdd_equation="A + B",
+        lvdd_equation="A & B"
+    )
+    
+    circuit = generator._create_alternative_implementation(
+        single_gate_circuit("TH12"), single_gate_circuit("TH22")
+    )
+    assert circuit['gates'] == [{
+        'type': 'th13m_th33m',
+        'inputs': {'A': 'A', 'B': 'B', 'C': 'A'},
+        'outputs': {'Z': 'w0'}
+    }]
+    assert circuit['inputs'] == ['A', 'B']
+    assert circuit['outputs'] == ['w0']
+
+def test_modifying_result_leaves_later_generations_intact(polymorphic_gates):
+    """Test that editing a returned circuit does not leak into later results."""
+    generator = PolymorphicCircuitGenerator(
+        polymorphic_gates,
+        hvdd_equation="(A + B) + C",
+        lvdd_equation="(A & B) & C"
+    )
+    expected = copy.deepcopy(generator.generate_circuits(2))
+    assert expected
+    
+    for circuit in generator.generate_circuits(2):
+        for gate in circuit['gates']:
+            gate['inputs']['A'] = 'renamed'
+            gate['outputs']['Z'] = 'renamed'
+    
+    assert generator.generate_circuits(2) == expected
+
+def test_generate_polymorphic_batch(polymorphic_gates):
+    """Test that batch generation matches generating each pair separately."""
+    pairs = [("A + B", "A & B"), ("(A + B) + C", "(A & B) & C"), ("A + B", "A & B & C")]
+    expected = [
+        PolymorphicCircuitGenerator(polymorphic_gates, hvdd, lvdd).generate_circuits()
+        for hvdd, lvdd in pairs
+    ]
+    
+    assert generate_polymorphic_batch(polymorphic_gates, pairs, max_workers=1) == expected
+    assert generate_polymorphic_batch(polymorphic_gates, pairs, max_workers=2) == expected
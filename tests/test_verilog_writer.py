@@ -1,5 +1,5 @@
 import pytest
-from mtncl_generator.writers.verilog_writer import VerilogWriter
+from mtncl_generator.writers.verilog_writer import VerilogWriter, write_verilog_netlist
 from mtncl_generator.core.circuit_generator import Circuit, GateInstance, Wire
 
 @pytest.fixture
@@ -186,4 +186,43 @@ def test_testbench_monitoring(complex_circuit):
     # Check that all signals are monitored
     monitor_line = testbench.split("$monitor")[1].split(";")[0]
     for signal in ["A", "B", "C", "D", "Z"]:
-        assert signal in monitor_line 
\ No newline at end of file
+        assert signal in monitor_line 
+
+def test_testbench_monitor_format(complex_circuit):
+    """Test that the monitor format string is a single-line literal."""
+    testbench = VerilogWriter(complex_circuit).generate_testbench()
+    
+    assert '$monitor($time, " sleep=%b rst=%b A=%b B=%b C=%b D=%b Z=%b",\n' in testbench
+    assert "            sleep, rst, A, B, C, D, Z\n        );" in testbench
+
+def test_testbench_uut_connections(simple_circuit):
+    """Test that every UUT port connection is comma separated."""
+    testbench = VerilogWriter(simple_circuit).generate_testbench()
+    
+    uut = testbench.split("uut (\n")[1].split("\n    );")[0]
+    assert uut.split(",\n") == [
+        "        .sleep(sleep)", "        .rst(rst)",
+        "        .A(A)", "        .B(B)", "        .Z(Z)"
+    ]
+
+def test_write_verilog_netlist_streams_to_file(complex_circuit, tmp_path, monkeypatch):
+    """Test that file output matches the generated text and failures keep old files."""
+    netlist_file = tmp_path / "circuit.v"
+    testbench_file = tmp_path / "circuit_tb.v"
+    write_verilog_netlist(complex_circuit, str(netlist_file))
+    write_verilog_netlist(complex_circuit, str(testbench_file), is_testbench=True)
+    
+    writer = VerilogWriter(complex_circuit)
+    netlist = writer.generate_netlist()
+    assert netlist_file.read_text() == netlist
+    assert testbench_file.read_text() == writer.generate_testbench()
+    
+    def fail_midway(self, fp):
+        fp.write("module partial (")
+        raise RuntimeError("write failed")
+    
+    monkeypatch.setattr(VerilogWriter, "write_netlist", fail_midway)
+    with pytest.raises(RuntimeError, match="write failed"):
+        write_verilog_netlist(complex_circuit, str(netlist_file))
+    assert netlist_file.read_text() == netlist
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["circuit.v", "circuit_tb.v"]